@@ -0,0 +1,12 @@
+"""rpg utility GUI settings shared by all pages"""
+
+# ----- IMPORTS ---------------------------------------------------------------
+import json
+from pathlib import Path
+
+# ----- CONSTANTS ---------------------------------------------------------------
+
+CONFIG_FILE = Path("config.json")  # GUI settings file path
+
+# Parsed once per process, no matter how many pages import it
+CONFIG = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
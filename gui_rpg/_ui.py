@@ -0,0 +1,20 @@
+"""rpg utility message boxes shared by all pages"""
+
+# ----- IMPORTS ---------------------------------------------------------------
+import wx
+
+# ===== FUNCTIONS =============================================================
+
+
+def show_error(parent, message):
+    """
+    Shows an error message box.
+    """
+    wx.MessageBox(message, "Error", wx.OK | wx.ICON_ERROR, parent)
+
+
+def show_success(parent, message):
+    """
+    Shows an information message box after a successful action.
+    """
+    wx.MessageBox(message, "Success", wx.OK | wx.ICON_INFORMATION, parent)
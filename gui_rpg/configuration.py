@@ -1,11 +1,14 @@
 """rpg utility configurations page"""
 
 # ----- IMPORTS ---------------------------------------------------------------
-import json
-from fnmatch import fnmatch
+from bisect import bisect_left
+from collections import namedtuple
+from functools import lru_cache
 import wx
 
-from rpg.rpgcore import RPGConfig
+from gui_rpg._config import CONFIG
+from gui_rpg._ui import show_error, show_success
+from rpg.rpgcore import RPGConfig, key_filter
 
 # ===== GLOBALS ===============================================================
 
@@ -13,19 +16,21 @@ rpg = RPGConfig()  # Configuration settings
 
 # ----- CONSTANTS ---------------------------------------------------------------
 
-with open("config.json", encoding="utf-8") as config_file:
-    CONFIG = json.load(config_file)
+BACKGROUND_COLOR = wx.Colour(CONFIG["COLORS"]["BACKGROUND_COLOR"])
 
 NUMBER_OF_COLUMNS = 2
+RESIZE_DELAY = 50  # milliseconds to wait for the last resize event
 
-# ===== FUNCTIONS =============================================================
-
-def show_error(parent, message):
-    wx.MessageBox(message, "Error", wx.OK | wx.ICON_ERROR, parent)
+ParamRec = namedtuple("ParamRec", "key value encrypt")  # parameter dialog record
 
+# ===== FUNCTIONS =============================================================
 
-def show_success(parent, message):
-    wx.MessageBox(message, "Success", wx.OK | wx.ICON_INFORMATION, parent)
+@lru_cache(maxsize=1024)
+def parameter_value(key) -> str:
+    """
+    Returns the displayed value of a parameter. Cached until a parameter is changed.
+    """
+    return rpg.get_param(key, decrypt=False)
 
 
 # ----- CLASSES ---------------------------------------------------------------
@@ -53,9 +58,9 @@ class AddChangeParameterDialog(wx.Dialog):
         self.cancel_btn = wx.Button(panel, wx.ID_CANCEL, "Cancel")
 
         if parameter_data: # pre-fill text if parameter data is provided
-            self.key_text.SetValue(parameter_data["key"])
-            self.value_text.SetValue(parameter_data["value"])
-            self.encrypt_choice.SetStringSelection(parameter_data["encrypt"])
+            self.key_text.SetValue(parameter_data.key)
+            self.value_text.SetValue(parameter_data.value)
+            self.encrypt_choice.SetStringSelection(parameter_data.encrypt)
 
             self.key_text.Enable(False)
 
@@ -80,15 +85,15 @@ class AddChangeParameterDialog(wx.Dialog):
         panel.SetSizer(main_sizer)
 
 
-    def get_parameter_data(self) -> dict:
+    def get_parameter_data(self) -> ParamRec:
         """
-        Returns parameter record as a dictionary.
+        Returns parameter record as a ParamRec tuple.
         """
-        return {
-            "key": self.key_text.GetValue(),
-            "value": self.value_text.GetValue(),
-            "encrypt":self.encrypt_choice.GetStringSelection()
-        }
+        return ParamRec(
+            self.key_text.GetValue(),
+            self.value_text.GetValue(),
+            self.encrypt_choice.GetStringSelection(),
+        )
 
 class Configuration(wx.Frame):
     """
@@ -106,6 +111,10 @@ class Configuration(wx.Frame):
     def init_gui(self, parent):
         self.panel = wx.Panel(self)
         self.parent = parent
+        self._params = {} # displayed parameter values by key
+        self._param_keys = [] # displayed keys in list order, kept sorted
+        self._last_col_width = None
+        self._resize_timer = None
         self.add_parameter_button = wx.Button(parent = self.panel, label = "Add Parameter")
         self.delete_parameter_button = wx.Button(parent = self.panel, label = 'Delete Parameter')
         self.back_button = wx.Button(parent = self.panel, label= 'Go Back')
@@ -119,7 +128,7 @@ class Configuration(wx.Frame):
 
         # add columns to the page
         self.list_ctrl = wx.ListCtrl(self.panel, style=wx.LC_REPORT | wx.BORDER_SUNKEN)
-        self.list_ctrl.SetBackgroundColour(wx.Colour(CONFIG["COLORS"]["BACKGROUND_COLOR"]))
+        self.list_ctrl.SetBackgroundColour(BACKGROUND_COLOR)
         self.list_ctrl.InsertColumn(0, "Parameter Name")
         self.list_ctrl.InsertColumn(1, "Parameter Value")
 
@@ -136,7 +145,7 @@ class Configuration(wx.Frame):
         main_sizer.Add(button_sizer, flag=wx.ALIGN_CENTER | wx.BOTTOM, border=10)
 
         self.panel.SetSizer(main_sizer)
-        self.SetBackgroundColour(wx.Colour(CONFIG["COLORS"]["BACKGROUND_COLOR"]))
+        self.SetBackgroundColour(BACKGROUND_COLOR)
         self.Center()
 
 
@@ -152,25 +161,49 @@ class Configuration(wx.Frame):
         self.Bind(wx.EVT_CLOSE, self.on_close)
 
 
-    def populate_parameter_list(self) -> None:
+    def populate_parameter_list(self, key_pattern: str = "") -> None:
         """
         Fetches Parameter data and populates the ListCtrl.
+        Only keys matching key_pattern are listed if a pattern is given.
+        """
+        matches = key_filter(key_pattern + "*")
+        self.list_ctrl.Freeze() # repaint once after all rows are in
+        try:
+            self.list_ctrl.DeleteAllItems()
+            self._params = {}
+            self._param_keys = []
+            for key in rpg.parameters():
+                if matches(key):
+                    value = self._params[key] = parameter_value(key)
+                    self._param_keys.append(key)
+                    self.list_ctrl.Append((key, value))
+        finally:
+            self.list_ctrl.Thaw()
+
+
+    def update_parameter_row(self, key) -> None:
         """
-        self.list_ctrl.DeleteAllItems()
-        key_pattern = ""
-        for idx,key in enumerate(rpg.parameters()):
-            if fnmatch(key, key_pattern + "*"):
-                value = rpg.get_param(key, decrypt=False)
-                self.list_ctrl.InsertItem(idx,key)
-                self.list_ctrl.SetItem(idx,1,value)
+        Shows the current value of a single parameter without repopulating the list.
+        """
+        key = rpg.optionxform(key)
+        is_new = key not in self._params
+        value = self._params[key] = parameter_value(key)
+        idx = bisect_left(self._param_keys, key)
+        if is_new:
+            self._param_keys.insert(idx, key)
+            self.list_ctrl.InsertItem(idx, key)
+        self.list_ctrl.SetItem(idx, 1, value)
 
 
     def adjust_column_widths(self):
         """
         Adjusts column widths dynamically to be 1/4 of window width.
         """
-        total_width = self.GetSize().Width - 20 
-        col_width = total_width // NUMBER_OF_COLUMNS
+        # the list control has a 10 pixel border on either side
+        col_width = (self.GetClientSize().Width - 20) // NUMBER_OF_COLUMNS
+        if col_width == self._last_col_width:
+            return
+        self._last_col_width = col_width
         for i in range(NUMBER_OF_COLUMNS):
             self.list_ctrl.SetColumnWidth(i, col_width)
 
@@ -180,13 +213,19 @@ class Configuration(wx.Frame):
         Handles window resize to adjust column widths.
         """
         event.Skip()
-        self.adjust_column_widths()
+        # a drag sends a burst of size events, only act on the last one
+        if self._resize_timer is None:
+            self._resize_timer = wx.CallLater(RESIZE_DELAY, self.adjust_column_widths)
+        else:
+            self._resize_timer.Restart(RESIZE_DELAY)
 
 
     def on_close(self, event):
         """
         Closes the dialog.
         """
+        if self._resize_timer is not None:
+            self._resize_timer.Stop()
         if self.parent:
             self.parent.Destroy()
         self.Destroy()
@@ -200,26 +239,26 @@ class Configuration(wx.Frame):
         dialog = AddChangeParameterDialog(self, title = "Add a Parameter")
         if dialog.ShowModal() == wx.ID_OK:
             parameter_data = dialog.get_parameter_data()
-            key = parameter_data.get("key","").strip().upper()
+            key = parameter_data.key.strip().upper()
             if not 4 <= len(key) <= 12:
                 show_error(self, message= "Parameter should be 4-12 characters long.")
                 dialog.Destroy()
                 return
 
-            value = parameter_data.get("value",'').strip()
+            value = parameter_data.value.strip()
             if not value:
                 show_error(self, message= "Value can not be Null. ")
                 dialog.Destroy()
                 return
 
-            encrypt = parameter_data["encrypt"] == "True"
+            encrypt = parameter_data.encrypt == "True"
             rpg.set_param(
                     param = key,
                     value = value,
                     encrypt=encrypt,
                 )
-            self.populate_parameter_list()
-            wx.Yield()
+            parameter_value.cache_clear()
+            self.update_parameter_row(key)
             show_success(self,message=f"Parameter '{key}' added successfully.")
 
         dialog.Destroy()
@@ -245,8 +284,10 @@ class Configuration(wx.Frame):
         if confirmation == wx.YES:
             rpg.remove_option("CONFIG", key)
             rpg.save()
-            self.populate_parameter_list()
-            wx.Yield()
+            parameter_value.cache_clear()
+            self.list_ctrl.DeleteItem(selected_index)
+            del self._params[key]
+            del self._param_keys[selected_index]
             show_success(self, f"Parameter '{key}' deleted successfully.")
 
 
@@ -259,40 +300,38 @@ class Configuration(wx.Frame):
             show_error(self, message="Please select a parameter to change.")
             return
 
-        parameter_data = {
-            "key": self.list_ctrl.GetItemText(selected_index),
-            "value": self.list_ctrl.GetItemText(selected_index, 1),
-        }
-        value = parameter_data.get("value","")
+        key = self.list_ctrl.GetItemText(selected_index)
+        value = self._params[key]
         if value == "<encrypted>":
             encrypted = "True"
         else:
             encrypted = "False"
-        parameter_data["encrypt"] = encrypted
+        parameter_data = ParamRec(key, value, encrypted)
         dialog = AddChangeParameterDialog(self, title = "Change Parameter", parameter_data = parameter_data)
-        if dialog.ShowModal() != wx.ID_OK:
-            return 
-
+        confirmed = dialog.ShowModal() == wx.ID_OK
         updated_data = dialog.get_parameter_data()
-        key = updated_data.get('key', '')
-        new_value = updated_data.get('value', '')
-        new_encrypted = updated_data.get('encrypt', 'False')
-
-        if not new_value:
-            show_error(self, message= "Parameter value cannot be empty.")
+        dialog.Destroy()
+        if not confirmed:
             return
 
-        if new_value == parameter_data.get('value','') and new_encrypted == encrypted: # no changes made to the parameter value
+        if updated_data == parameter_data: # no changes made, skip validation and saving
             show_success(self, message=f' No changes in parameter {key}.')
             return
 
+        new_value = updated_data.value
+        new_encrypted = updated_data.encrypt
+
+        if not new_value:
+            show_error(self, message= "Parameter value cannot be empty.")
+            return
+
         if not rpg.has_param(key):
             show_error(self, message=f'Parameter {key} does not exist.')
             return
 
         rpg.set_param(param = key, value = new_value, encrypt = new_encrypted == "True")
-        self.populate_parameter_list()
-        wx.Yield()
+        parameter_value.cache_clear()
+        self.update_parameter_row(key)
         show_success(self,message=f"Parameter '{key}' changed successfully.")
 
     def on_back_button_click(self,event) -> None:
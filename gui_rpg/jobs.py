@@ -1,13 +1,16 @@
 """rpg utility jobs page"""
 
 # ----- IMPORTS ---------------------------------------------------------------
-import json
 import re
-from fnmatch import fnmatch
+from bisect import bisect_left
+from collections import namedtuple
+from functools import lru_cache
 import wx
 
 
-from rpg.rpgcore import RPGConfig
+from gui_rpg._config import CONFIG
+from gui_rpg._ui import show_error, show_success
+from rpg.rpgcore import RPGConfig, key_filter
 
 # ===== GLOBALS ===============================================================
 
@@ -15,26 +18,58 @@ rpg = RPGConfig()  # Configuration settings
 
 # ----- CONSTANTS ---------------------------------------------------------------
 
-with open("config.json", encoding="utf-8") as config_file:
-    CONFIG = json.load(config_file)
+BACKGROUND_COLOR = wx.Colour(CONFIG["COLORS"]["BACKGROUND_COLOR"])
 
 NUMBER_OF_COLUMNS = 4
-JOBS_PATTERN1 = re.compile(r'^[A-Z]{4,12}$')
-JOBS_PATTERN2 = re.compile(r'^[A-Z]{2,8}[0-9]{2}[A-Z]?$')
+RESIZE_DELAY = 50  # milliseconds to wait for the last resize event
+JOB_ID_PATTERN = re.compile(r'^(?:[A-Z]{4,12}|[A-Z]{2,8}[0-9]{2}[A-Z]?)$')
 WEEKDAYS = {"MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"}
 
+NewJobRec = namedtuple("NewJobRec", "job_id frequency")  # add job dialog record
+# change job dialog record
+JobRec = namedtuple("JobRec", "job_id last_run next_run frequency")
+
 # ===== FUNCTIONS =============================================================
 
-def show_error(parent, message):
-    wx.MessageBox(message, "Error", wx.OK | wx.ICON_ERROR, parent)
+def format_run_time(run_time) -> str:
+    """
+    Formats a run time as "YYYY-MM-DD HH:MM" without a strftime call.
+    """
+    return (f"{run_time.year:04d}-{run_time.month:02d}-{run_time.day:02d} "
+            f"{run_time.hour:02d}:{run_time.minute:02d}")
 
 
-def show_success(parent, message):
-    wx.MessageBox(message, "Success", wx.OK | wx.ICON_INFORMATION, parent)
+@lru_cache(maxsize=1024)
+def job_row(job_id) -> tuple:
+    """
+    Returns the list columns of a job: ID, last run, next run and frequency.
+    Rows are cached until job_row.cache_clear() is called.
+    """
+    _, _, last_run, next_run = rpg.get_job(job_id)
+    freq = "Every " + rpg.get_job_day_text(job_id)
+    last_run = format_run_time(last_run) if last_run else "Never"
+    next_run = format_run_time(next_run)
+    return job_id, last_run, next_run, freq
 
 
 # ----- CLASSES ---------------------------------------------------------------
 
+class JobListCtrl(wx.ListCtrl):
+    """
+    Virtual list of jobs. Rows are only built when wx needs to display them.
+    """
+    def __init__(self, parent):
+        super().__init__(parent, style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.BORDER_SUNKEN)
+        self.job_ids = []
+
+
+    def OnGetItemText(self, item, column): # pylint: disable=invalid-name
+        """
+        Returns the text of a cell, called by wx for visible rows only.
+        """
+        return job_row(self.job_ids[item])[column]
+
+
 class AddJobDialog(wx.Dialog):
     """
     Add a new job record window.
@@ -76,14 +111,11 @@ class AddJobDialog(wx.Dialog):
         panel.SetSizer(main_sizer)
 
 
-    def get_job_data(self) -> dict:
+    def get_job_data(self) -> NewJobRec:
         """
-        Returns job details as a dictionary.
+        Returns job details as a NewJobRec tuple.
         """
-        return {
-            "job_id": self.id_text.GetValue(),
-            "frequency": self.frequency_text.GetValue(),
-        }
+        return NewJobRec(self.id_text.GetValue(), self.frequency_text.GetValue())
 
 
 class ChangeJobDialog(wx.Dialog):
@@ -110,10 +142,10 @@ class ChangeJobDialog(wx.Dialog):
         self.ok_btn = wx.Button(panel, wx.ID_OK, "OK")
         self.cancel_btn = wx.Button(panel, wx.ID_CANCEL, "Cancel")
 
-        self.id_text.SetValue(job_data["job_id"])
-        self.last_run_text.SetValue(job_data["last_run"])  
-        self.next_run_text.SetValue(job_data["next_run"])
-        self.frequency_text.SetValue(job_data["frequency"])
+        self.id_text.SetValue(job_data.job_id)
+        self.last_run_text.SetValue(job_data.last_run)
+        self.next_run_text.SetValue(job_data.next_run)
+        self.frequency_text.SetValue(job_data.frequency)
 
 
         # Add to layout
@@ -138,16 +170,16 @@ class ChangeJobDialog(wx.Dialog):
         panel.SetSizer(main_sizer)
 
 
-    def get_job_data(self) -> dict:
+    def get_job_data(self) -> JobRec:
         """
-        Returns an existing job record as a dictionary.
+        Returns an existing job record as a JobRec tuple.
         """
-        return {
-            "job_id": self.id_text.GetValue(),
-            "last_run": self.last_run_text.GetValue(),
-            "next_run": self.next_run_text.GetValue(),
-            "frequency": self.frequency_text.GetValue(),
-        }
+        return JobRec(
+            self.id_text.GetValue(),
+            self.last_run_text.GetValue(),
+            self.next_run_text.GetValue(),
+            self.frequency_text.GetValue(),
+        )
 
 
 class Jobs(wx.Frame):
@@ -165,6 +197,8 @@ class Jobs(wx.Frame):
     def init_gui(self, parent):
         self.panel = wx.Panel(self)
         self.parent = parent
+        self._last_col_width = None
+        self._resize_timer = None
         self.add_job_button = wx.Button(parent = self.panel, label = "Add Job")
         self.delete_job_button = wx.Button(parent = self.panel, label = 'Delete Job')
         self.back_button = wx.Button(parent = self.panel, label = 'Go Back')
@@ -177,8 +211,8 @@ class Jobs(wx.Frame):
         title.SetFont(font)
 
         # add columns to page
-        self.list_ctrl = wx.ListCtrl(self.panel, style=wx.LC_REPORT | wx.BORDER_SUNKEN)
-        self.list_ctrl.SetBackgroundColour(wx.Colour(CONFIG["COLORS"]["BACKGROUND_COLOR"]))
+        self.list_ctrl = JobListCtrl(self.panel)
+        self.list_ctrl.SetBackgroundColour(BACKGROUND_COLOR)
         self.list_ctrl.InsertColumn(0, "Job Name")
         self.list_ctrl.InsertColumn(1, "Last Run")
         self.list_ctrl.InsertColumn(2, "Next Run")
@@ -199,7 +233,7 @@ class Jobs(wx.Frame):
         main_sizer.Add(button_sizer, flag=wx.ALIGN_CENTER | wx.BOTTOM, border=10)
 
         self.panel.SetSizer(main_sizer)
-        self.SetBackgroundColour(wx.Colour(CONFIG["COLORS"]["BACKGROUND_COLOR"]))
+        self.SetBackgroundColour(BACKGROUND_COLOR)
         self.Center()
 
 
@@ -215,31 +249,36 @@ class Jobs(wx.Frame):
         self.Bind(wx.EVT_CLOSE, self.on_close)
 
 
-    def populate_jobs_list(self) -> None:
+    def populate_jobs_list(self, name_pattern: str = "") -> None:
         """
         Fetches jobs data and populates the ListCtrl.
+        Only jobs matching name_pattern are listed if a pattern is given.
         """
-        self.list_ctrl.DeleteAllItems()
-        name_pattern = ""
-        for idx, job_id in enumerate(rpg.jobs()):
-            if fnmatch(job_id, name_pattern + "*"):
-                _, _, last_run, next_run = rpg.get_job(job_id)
-                freq = "Every " + rpg.get_job_day_text(job_id)
-                last_run = last_run.strftime("%Y-%m-%d %H:%M") if last_run else "Never"
-                next_run = next_run.strftime("%Y-%m-%d %H:%M")
+        matches = key_filter(name_pattern + "*")
+        job_row.cache_clear()
+        self.list_ctrl.job_ids = [job_id for job_id in rpg.jobs() if matches(job_id)]
+        self.refresh_job_rows(0)
+
 
-                self.list_ctrl.InsertItem(idx,job_id)
-                self.list_ctrl.SetItem(idx,1,last_run)
-                self.list_ctrl.SetItem(idx,2,next_run)
-                self.list_ctrl.SetItem(idx,3,freq)
+    def refresh_job_rows(self, first_index) -> None:
+        """
+        Updates the number of rows and repaints the rows from first_index on.
+        """
+        count = len(self.list_ctrl.job_ids)
+        self.list_ctrl.SetItemCount(count)
+        if first_index < count:
+            self.list_ctrl.RefreshItems(first_index, count - 1)
 
 
     def adjust_column_widths(self):
         """
         Adjusts column widths dynamically to be 1/4 of window width.
         """
-        total_width = self.GetSize().Width - 20 
-        col_width = total_width // NUMBER_OF_COLUMNS
+        # the list control has a 10 pixel border on either side
+        col_width = (self.GetClientSize().Width - 20) // NUMBER_OF_COLUMNS
+        if col_width == self._last_col_width:
+            return
+        self._last_col_width = col_width
         for i in range(NUMBER_OF_COLUMNS):
             self.list_ctrl.SetColumnWidth(i, col_width)
 
@@ -249,13 +288,19 @@ class Jobs(wx.Frame):
         Handles window resize to adjust column widths.
         """
         event.Skip()
-        self.adjust_column_widths()
+        # a drag sends a burst of size events, only act on the last one
+        if self._resize_timer is None:
+            self._resize_timer = wx.CallLater(RESIZE_DELAY, self.adjust_column_widths)
+        else:
+            self._resize_timer.Restart(RESIZE_DELAY)
 
 
     def on_close(self, event):
         """
         Closes the dialog.
         """
+        if self._resize_timer is not None:
+            self._resize_timer.Stop()
         if self.parent:
             self.parent.Destroy()
         self.Destroy()
@@ -268,10 +313,12 @@ class Jobs(wx.Frame):
         dialog = AddJobDialog(self, title = "Add Job")
         if dialog.ShowModal() == wx.ID_OK:
             job_data = dialog.get_job_data()
-            job_id = job_data.get("job_id",'').strip().upper()
-            day = job_data.get("frequency",'').strip()
+            job_id = job_data.job_id.strip().upper()
+            day = job_data.frequency.strip()
 
-            if not (JOBS_PATTERN1.match(job_id) or JOBS_PATTERN2.match(job_id)):
+            # cheap length and charset test first, the pattern only sees plausible IDs
+            if (not 4 <= len(job_id) <= 12 or not job_id.isalnum()
+                    or not JOB_ID_PATTERN.match(job_id)):
                 show_error(self, message='Invalid Job format. Must be 4-12 letters or follow format: 2-8 letters, 2 digits, optional letter.')
                 dialog.Destroy()
                 return
@@ -284,14 +331,17 @@ class Jobs(wx.Frame):
                     show_error(self, message= "Frequency must be in range 1-28")
                     dialog.Destroy()
                     return
-            elif day.upper() not in WEEKDAYS:
+            elif not (day in WEEKDAYS or day.upper() in WEEKDAYS):
                 show_error(self, message= "Frequency must be three letter weekday (Mon, Tue, etc.) or number in range 1-28")
                 dialog.Destroy()
                 return
+            else:
+                day = day if day in WEEKDAYS else day.upper()
 
-            rpg.set_job(job_id= job_id, day= day.upper())
-            self.populate_jobs_list()
-            wx.Yield()
+            rpg.set_job(job_id= job_id, day= day)
+            idx = bisect_left(self.list_ctrl.job_ids, job_id) # keep the list sorted
+            self.list_ctrl.job_ids.insert(idx, job_id)
+            self.refresh_job_rows(idx)
             show_success(self,message='Job added successfully.')
         dialog.Destroy()
 
@@ -305,40 +355,38 @@ class Jobs(wx.Frame):
             show_error(self, "Please select a Job to change.")
             return
 
-        job_data = {
-            "job_id": self.list_ctrl.GetItemText(selected_index),
-            "last_run": self.list_ctrl.GetItemText(selected_index, 1),
-            "next_run": self.list_ctrl.GetItemText(selected_index, 2),
-            "frequency": self.list_ctrl.GetItemText(selected_index, 3)
-        }
+        # the row is already cached for display, no need to ask the control
+        job_data = JobRec(*job_row(self.list_ctrl.job_ids[selected_index]))
 
         dialog = ChangeJobDialog(self, title = "Change Server", job_data = job_data)
-        if dialog.ShowModal() != wx.ID_OK:
-            return 
-
+        confirmed = dialog.ShowModal() == wx.ID_OK
         updated_data = dialog.get_job_data()
-        job_id = updated_data.get('job_id')
-        new_frequency = updated_data.get('frequency', '').strip()
-
-        if not new_frequency:
-            show_error(self, "Job frequency cannot be empty.")
+        dialog.Destroy()
+        if not confirmed:
             return
 
-        if new_frequency == job_data["frequency"]: # no changes made to the job
+        job_id = job_data.job_id
+        new_frequency = updated_data.frequency.strip()
+
+        if new_frequency == job_data.frequency: # no changes made, skip validation and saving
             show_success(self, message=f' No changes in Job {job_id}.')
             return
 
+        if not new_frequency:
+            show_error(self, "Job frequency cannot be empty.")
+            return
+
         if new_frequency.isdigit():
             if not (1<= int(new_frequency) <= 28):
                 show_error(self, message= "Frequency must be in range 1-28")
-                dialog.Destroy()
                 return
-            normalized_frequency = new_frequency 
+            normalized_frequency = new_frequency
+        elif new_frequency in WEEKDAYS:
+            normalized_frequency = new_frequency
         elif new_frequency.upper() in WEEKDAYS:
             normalized_frequency = new_frequency.upper()
         else:
             show_error(self, message= "Frequency must be three letter weekday (Mon, Tue, etc.) or number in range 1-28")
-            dialog.Destroy()
             return
 
         if not rpg.job_exists(job_id):
@@ -346,8 +394,8 @@ class Jobs(wx.Frame):
             return
 
         rpg.set_job(job_id=job_id, day=normalized_frequency)
-        self.populate_jobs_list()
-        wx.Yield()
+        job_row.cache_clear()
+        self.list_ctrl.RefreshItem(selected_index)
         show_success(self, message=f'Job {job_id} changed successfully.')
 
 
@@ -360,7 +408,7 @@ class Jobs(wx.Frame):
             show_error(self,"Please select a Job to delete.")
             return
 
-        job_id = self.list_ctrl.GetItemText(selected_index)
+        job_id = self.list_ctrl.job_ids[selected_index]
         confirmation = wx.MessageBox(
             f"Are you sure you want to delete job '{job_id}'?",
             "Confirm Delete",
@@ -370,8 +418,9 @@ class Jobs(wx.Frame):
 
         if confirmation == wx.YES:
             rpg.delete_job(job_id)
-            self.populate_jobs_list()
-            wx.Yield()
+            job_row.cache_clear()
+            del self.list_ctrl.job_ids[selected_index]
+            self.refresh_job_rows(selected_index)
             show_success(self, f"Job '{job_id}' deleted successfully.")
 
 
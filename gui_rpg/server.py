@@ -1,11 +1,13 @@
 """rpg utility server page"""
 
 # ----- IMPORTS ---------------------------------------------------------------
-import json
 import re
 import ipaddress
+import string
 import wx
 
+from gui_rpg._config import CONFIG
+from gui_rpg._ui import show_error, show_success
 from rpg.rpgcore import RPGConfig
 
 # ===== GLOBALS ===============================================================
@@ -14,23 +16,27 @@ rpg = RPGConfig()  # Configuration settings
 
 # ----- CONSTANTS ---------------------------------------------------------------
 
-with open("config.json", encoding='utf-8') as config_file:
-    CONFIG = json.load(config_file)
-
 NUMBER_OF_COLUMNS = 4
-IP_PATTERN = re.compile(r'^\d+(\.\d+){3}$')
-HOSTNAME_PATTERN = re.compile(r'^(?=.{1,253}$)(?!-)[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?'
-                              r'(\.[A-Za-z0-9]([A-Za-z0-9-]{0,61}[A-Za-z0-9])?)*$')
+RESIZE_DELAY = 50  # milliseconds to wait for the last resize event
+SERVER_ID_PATTERN = re.compile(r'^[A-Za-z0-9]{4,16}$')
+HOSTNAME_CHARS = frozenset(string.ascii_letters + string.digits + "-")
 
 
 # ===== FUNCTIONS =============================================================
 
-def show_error(parent, message):
-    wx.MessageBox(message, "Error", wx.OK | wx.ICON_ERROR, parent)
-
+def _is_hostname(address) -> bool:
+    """
+    Checks a hostname label by label: 1-63 letters, digits or hyphens,
+    not starting or ending with a hyphen, 253 characters at most overall.
+    """
+    if not 1 <= len(address) <= 253:
+        return False
+    for label in address.split("."):
+        if (not 1 <= len(label) <= 63 or label[0] == "-" or label[-1] == "-"
+                or not HOSTNAME_CHARS.issuperset(label)):
+            return False
+    return True
 
-def show_success(parent, message):
-    wx.MessageBox(message, "Success", wx.OK | wx.ICON_INFORMATION, parent)
 
 def validate_ip(address) -> int:
     """
@@ -43,14 +49,16 @@ def validate_ip(address) -> int:
         int: 0 if the IP address is valid else return -1
 
     """
-    if IP_PATTERN.match(address):
-        try:
-            ipaddress.IPv4Network(address)
-        except:
-            return -1
-    else:
-        if not HOSTNAME_PATTERN.match(address):
-            return -1
+    try:
+        ipaddress.IPv4Address(address)
+        return 0
+    except ValueError:
+        pass
+    # four numeric parts is meant as an IP address, don't let it pass as a hostname
+    if address.count(".") == 3 and address.replace(".", "").isdigit():
+        return -1
+    if not _is_hostname(address):
+        return -1
     return 0
 
 
@@ -65,10 +73,11 @@ def validate_port(port_number) -> int:
         int: 0 if the port number is valid else return -1
 
     """
-    if not port_number.isdigit():
+    if not (port_number.isascii() and port_number.isdigit()):
         return -1
-    port_number = int(port_number)
-    if not 1<= port_number <= 32767:
+    # compare as text, equal length digit strings sort like their numbers
+    digits = port_number.lstrip("0")
+    if not digits or len(digits) > 5 or (len(digits) == 5 and digits > "32767"):
         return -1
     return 0
 
@@ -76,6 +85,22 @@ def validate_port(port_number) -> int:
 
 # ----- CLASSES ---------------------------------------------------------------
 
+class ServerListCtrl(wx.ListCtrl):
+    """
+    Virtual list of servers. wx asks for the text of visible rows only.
+    """
+    def __init__(self, parent):
+        super().__init__(parent, style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.BORDER_SUNKEN)
+        self.rows = []  # (server id, address, type, user) per row
+
+
+    def OnGetItemText(self, item, column): # pylint: disable=invalid-name
+        """
+        Returns the text of a cell, called by wx for visible rows only.
+        """
+        return self.rows[item][column]
+
+
 class AddChangeServerDialog(wx.Dialog):
     """
     Add a new server or change an existing server
@@ -108,8 +133,9 @@ class AddChangeServerDialog(wx.Dialog):
 
         if server_data: # pre-fill text if server data is provided
             self.id_text.SetValue(server_data["server_id"])
-            self.ip_text.SetValue(server_data["address"].split(':')[0]) 
-            self.port_text.SetValue(server_data["address"].split(':')[1])
+            host, _, port = server_data["address"].partition(':')
+            self.ip_text.SetValue(host)
+            self.port_text.SetValue(port)
             self.type_choice.SetStringSelection(server_data["server_type"])
             self.username_text.SetValue(server_data["user"])
 
@@ -170,6 +196,8 @@ class Server(wx.Frame):
         """
         self.panel = wx.Panel(self)
         self.parent = parent
+        self._last_col_width = None
+        self._resize_timer = None
         self.add_server_button = wx.Button(parent = self.panel, label = "Add Server")
         self.delete_server_button = wx.Button(parent = self.panel, label = 'Delete Server')
         self.back_button = wx.Button(parent = self.panel, label = 'Go Back')
@@ -182,7 +210,7 @@ class Server(wx.Frame):
         title.SetFont(font)
 
         # add columns to page
-        self.list_ctrl = wx.ListCtrl(self.panel, style=wx.LC_REPORT | wx.BORDER_SUNKEN)
+        self.list_ctrl = ServerListCtrl(self.panel)
         self.list_ctrl.SetBackgroundColour(wx.Colour(CONFIG["COLORS"]["BACKGROUND_COLOR"]))
         self.list_ctrl.InsertColumn(0, "Server ID")
         self.list_ctrl.InsertColumn(1, "Server Address")
@@ -224,26 +252,35 @@ class Server(wx.Frame):
         """
         Fetches server data and populates the ListCtrl.
         """
-        self.list_ctrl.DeleteAllItems()
-        for idx, server_name in enumerate(rpg.servers()):
-            try:
-                hostname, port, username, _, server_type = rpg.get_server(server_name)
-                address = f"{hostname}:{port}"
-            except KeyError:
+        rows = []
+        for server_name, server in rpg.get_servers_bulk().items():
+            if server is None:
                 address, server_type, username = "Decryption Error", "N/A", "N/A"
+            else:
+                hostname, port, username, _, server_type = server
+                address = f"{hostname}:{port}"
+            rows.append((server_name, address, server_type, username))
 
-            self.list_ctrl.InsertItem(idx, server_name)
-            self.list_ctrl.SetItem(idx, 1, address)
-            self.list_ctrl.SetItem(idx, 2, server_type)
-            self.list_ctrl.SetItem(idx, 3, username)
+        # one repaint once the new rows are in place
+        self.list_ctrl.Freeze()
+        try:
+            self.list_ctrl.rows = rows
+            self.list_ctrl.SetItemCount(len(rows))
+            if rows:
+                self.list_ctrl.RefreshItems(0, len(rows) - 1)
+        finally:
+            self.list_ctrl.Thaw()
 
 
     def adjust_column_widths(self):
         """
         Adjusts column widths dynamically to be 1/4 of window width.
         """
-        total_width = self.GetSize().Width - 20 
-        col_width = total_width // NUMBER_OF_COLUMNS
+        # the list control has a 10 pixel border on either side
+        col_width = (self.GetClientSize().Width - 20) // NUMBER_OF_COLUMNS
+        if col_width == self._last_col_width:
+            return
+        self._last_col_width = col_width
         for i in range(NUMBER_OF_COLUMNS):
             self.list_ctrl.SetColumnWidth(i, col_width)
 
@@ -253,13 +290,19 @@ class Server(wx.Frame):
         Handles window resize to adjust column widths.
         """
         event.Skip()
-        self.adjust_column_widths()
+        # a drag sends a burst of size events, only act on the last one
+        if self._resize_timer is None:
+            self._resize_timer = wx.CallLater(RESIZE_DELAY, self.adjust_column_widths)
+        else:
+            self._resize_timer.Restart(RESIZE_DELAY)
 
 
     def on_close(self, event):
         """
         Closes the dialog.
         """
+        if self._resize_timer is not None:
+            self._resize_timer.Stop()
         if self.parent:
             self.parent.Destroy()
         self.Destroy()
@@ -278,7 +321,7 @@ class Server(wx.Frame):
             user = server_data.get("user",'').strip()
             password = server_data.get("password",'').strip()
             # perform data checks on server id
-            if len(server_id) < 4 or len(server_id) > 16 or not server_id.isalnum():
+            if not SERVER_ID_PATTERN.match(server_id):
                 show_error(self, message= "Server name must be 4-16 alpha numeric characters.")
                 dialog.Destroy()
                 return
@@ -313,7 +356,6 @@ class Server(wx.Frame):
                 return
             rpg.set_server(**server_data)
             self.populate_server_list()
-            wx.Yield()
             show_success(self,message='Server added successfully')
         dialog.Destroy()
 
@@ -326,11 +368,12 @@ class Server(wx.Frame):
             show_error(self,"Please select a server to change.")
             return
 
+        server_id, address, server_type, user = self.list_ctrl.rows[selected_index]
         server_data = {
-            "server_id": self.list_ctrl.GetItemText(selected_index),
-            "address": self.list_ctrl.GetItemText(selected_index, 1),
-            "server_type": self.list_ctrl.GetItemText(selected_index, 2),
-            "user": self.list_ctrl.GetItemText(selected_index, 3)
+            "server_id": server_id,
+            "address": address,
+            "server_type": server_type,
+            "user": user
         }
 
         dialog = AddChangeServerDialog(self, title = "Change Server", server_data = server_data)
@@ -376,7 +419,6 @@ class Server(wx.Frame):
 
             rpg.set_server(**updated_data)
             self.populate_server_list()
-            wx.Yield()
             show_success(self,message = f'Server {server_name} changed successfully.')
                 
 
@@ -389,7 +431,7 @@ class Server(wx.Frame):
             show_error(self,"Please select a server to delete.")
             return
 
-        server_id = self.list_ctrl.GetItemText(selected_index)
+        server_id = self.list_ctrl.rows[selected_index][0]
         confirmation = wx.MessageBox(
             f"Are you sure you want to delete server '{server_id}'?",
             "Confirm Delete",
@@ -399,7 +441,6 @@ class Server(wx.Frame):
         if confirmation == wx.YES:
             rpg.delete_server(server_id)
             self.populate_server_list()
-            wx.Yield()
             show_success(self, f"Server '{server_id}' deleted successfully.")
 
 
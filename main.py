@@ -1,19 +1,13 @@
 """RPG GUI Main frame"""
 
 # ----- IMPORTS ---------------------------------------------------------------
-import json
 import wx
 
+from gui_rpg._config import CONFIG
 from gui_rpg.jobs import Jobs
 from gui_rpg.server import Server
 from gui_rpg.configuration import Configuration
 
-# ----- CONSTANTS ---------------------------------------------------------------
-
-with open("config.json", encoding='utf-8') as config_file:
-    CONFIG = json.load(config_file)
-
-
 # ----- CLASSES ---------------------------------------------------------------
 
 class MainFrame(wx.Frame):
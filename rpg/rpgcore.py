@@ -2,16 +2,38 @@
 
 # ----- IMPORTS ---------------------------------------------------------------
 
+import atexit
+import hashlib
+import io
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import re
-from configparser import ConfigParser
+import sys
+import threading
+from contextlib import contextmanager, suppress
+from collections.abc import Callable, Iterator
+from configparser import ConfigParser, SectionProxy
 from datetime import datetime
+from fnmatch import translate
+from functools import lru_cache
 from pathlib import Path
 
 import colorama as co
 from croniter import croniter
 from cryptography.fernet import Fernet, InvalidToken
 
+try:  # Optional Rust implementation of Fernet, much faster on small values
+    from rfernet import DecryptionError as FastInvalidToken
+    from rfernet import Fernet as FastFernet
+except ImportError:
+    FastFernet = None
+    INVALID_TOKEN_ERRORS: tuple[type[Exception], ...] = (InvalidToken,)
+else:
+    INVALID_TOKEN_ERRORS = (InvalidToken, FastInvalidToken)
+
 # ----- CONSTANTS -------------------------------------------------------------
 
 CONFIG_FILE = Path("rpg_ods.ini")  # Configuration file path
@@ -27,18 +49,63 @@ WEEKDAY_REGEX = (
     r"(?:[0-7]L|[0-7]#[1-5]|MON|TUE|WED|THU|FRI|SAT|SUN)"
     + r"(?:,(?:[0-7]L|[0-7]#[1-5]|MON|TUE|WED|THU|FRI|SAT|SUN))*"
 )
+DAY_OF_MONTH_PATTERN = re.compile(DAY_OF_MONTH_REGEX)
+WEEKDAY_PATTERN = re.compile(WEEKDAY_REGEX)
 
 PARAMETER_SECTION = "CONFIG"  # Configuration section name
 JOB_PREFIX = "JOB:"  # Job section prefix
 SERVER_PREFIX = "SERVER:"  # Server section prefix
 
+CONFIG_CACHE_SUFFIX = ".cache.json"  # Parsed configuration, kept next to the file
+
 LOG_FILE_PATH = Path("rpg.log")
 LOG_FORMAT = "{asctime:s} {name:s} {levelname:>7s} {message:s}"
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+LOG_BUFFER_SIZE = 65536  # Log file write buffer in bytes
+LOG_FLUSH_RECORDS = 100  # Flush the log file after this many records
+
+# Weekday names and cron weekday numbers to display text
+WEEKDAY_MAP = {
+    "MON": "Mon",
+    "TUE": "Tue",
+    "WED": "Wed",
+    "THU": "Thu",
+    "FRI": "Fri",
+    "SAT": "Sat",
+    "SUN": "Sun",
+    "0": "Sun",
+    "1": "Mon",
+    "2": "Tue",
+    "3": "Wed",
+    "4": "Thu",
+    "5": "Fri",
+    "6": "Sat",
+}
+
+# Ordinal suffix by number modulo 100: 1st, 2nd, 3rd, 4th ... 11th, 12th, 13th ... 21st
+ORDINAL_SUFFIXES = tuple(
+    "th" if 11 <= n <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    for n in range(100)
+)
+
+GLOB_CHARS = frozenset("*?[")  # Characters with a special meaning in wildcards
 
 COLOR_HIGH = co.Style.RESET_ALL + co.Style.BRIGHT + co.Fore.WHITE
 COLOR_RESET = co.Style.RESET_ALL
 
+# ----- GLOBALS ---------------------------------------------------------------
+
+# Ciphers by (key file path, modification time), shared by all RPGConfig instances
+_cipher_cache: dict[tuple[str, int], "Fernet | FastFernet"] = {}
+
+# Records of all RPGLog instances, written by one listener thread in file order
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listeners: dict[str, "LogListener"] = {}  # "main" once started on first use
+_log_listener_lock = threading.Lock()
+
+# Parsed configuration files by path, with the digest of the contents they came from
+_config_cache: dict[str, tuple[str, dict[str, dict[str, str]]]] = {}
+
 # ----- CLASSES ---------------------------------------------------------------
 
 
@@ -89,6 +156,8 @@ class StreamHandler(logging.StreamHandler):
         self.setLevel(logging.DEBUG)
         self.setFormatter(LogFormatter())
         co.init(convert=True)
+        # Write to stdout like print() did, through colorama's wrapper set up above
+        self.stream = sys.stdout
 
     def emit(self, record: logging.LogRecord) -> None:
         """Emit a log record
@@ -99,9 +168,99 @@ class StreamHandler(logging.StreamHandler):
         color = self.color_map.get(record.levelno, COLOR_HIGH)
         try:
             message = self.format(record)
-            print(color + message + COLOR_RESET)
+            self.stream.write(f"{color}{message}{COLOR_RESET}{self.terminator}")
+            self.flush()
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.handleError(record)
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """Log file handler with a large write buffer
+    Flushes every LOG_FLUSH_RECORDS records or straight away for errors and
+    criticals, instead of after every record. The LogListener also flushes it
+    whenever no more records are waiting, so nothing stays buffered while the
+    program is idle.
+    """
+
+    def __init__(
+        self,
+        filename: Path,
+        mode: str = "a",
+        encoding: str | None = None,
+        delay: bool = False,
+    ):
+        self._pending = 0  # records written since the last flush
+        super().__init__(filename, mode=mode, encoding=encoding, delay=delay)
+
+    def _open(self):
+        """Open the log file with a LOG_BUFFER_SIZE write buffer"""
+        return open(  # pylint: disable=consider-using-with
+            self.baseFilename,
+            self.mode,
+            buffering=LOG_BUFFER_SIZE,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write a log record, flushing only when due
+
+        Args:
+            record (logging.LogRecord): The log record
+        """
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
         except Exception:  # pylint: disable=broad-exception-caught
             self.handleError(record)
+            return
+        self._pending += 1
+        if record.levelno >= logging.ERROR or self._pending >= LOG_FLUSH_RECORDS:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered records to the log file"""
+        super().flush()
+        self._pending = 0
+
+
+class LogListener(logging.handlers.QueueListener):
+    """Queue listener of the RPG loggers
+    Flushes its handlers each time the queue runs empty, so buffered records
+    are written as soon as the program stops logging.
+    """
+
+    def handle(self, record: logging.LogRecord) -> None:
+        """Pass a log record to the handlers, flushing them if it was the last
+
+        Args:
+            record (logging.LogRecord): The log record
+        """
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler of the RPG loggers
+    Puts records on the queue shared by all RPGLog instances and starts the
+    listener that writes them when the first record arrives.
+    """
+
+    def __init__(self):
+        super().__init__(_log_queue)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put a log record on the shared queue
+
+        Args:
+            record (logging.LogRecord): The log record
+        """
+        if not _log_listeners:
+            start_log_listener()
+        super().enqueue(record)
 
 
 class RPGLog(logging.Logger):
@@ -118,19 +277,8 @@ class RPGLog(logging.Logger):
         super().__init__(name)
         self.setLevel(level)
 
-        console_format = LogFormatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT, style="{")
-        console_handler = StreamHandler()
-        console_handler.setLevel(logging.DEBUG)
-        console_handler.setFormatter(console_format)
-        self.addHandler(console_handler)
-
-        file_format = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT, style="{")
-        file_handler = logging.FileHandler(
-            filename=LOG_FILE_PATH, mode="a", encoding="utf-8"
-        )
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(file_format)
-        self.addHandler(file_handler)
+        # Callers only put records on a queue, a background thread does the I/O
+        self.addHandler(LogQueueHandler())
 
         # TODO: Add an SMTP handler for email notifications of errors and crits
         # Reference: https://docs.python.org/3/library/logging.handlers.html#smtphandler
@@ -154,13 +302,21 @@ class RPGLog(logging.Logger):
 class RPGConfig(ConfigParser):
     """RPG Configuration Class"""
 
-    __cipher: Fernet
+    __cipher: "Fernet | FastFernet"
     log = RPGLog()
+    # Sorted job and server IDs by section prefix, rebuilt after sections change
+    _section_index: dict[str, list[str]] | None = None
 
     def __init__(self):
         super().__init__()
+        self._autosave = True  # write the file on every save() call
+        self._dirty = False  # changes not written to the file yet
+        # get_job results by job ID, with the cron and last_run text they came from
+        self._job_cache: dict[
+            str, tuple[str, str, tuple[bool, str, datetime, datetime]]
+        ] = {}
         if CONFIG_FILE.exists():
-            self.log.debug(f"Reading configuration from {CONFIG_FILE.name}")
+            self.log.debug("Reading configuration from %s", CONFIG_FILE.name)
             self.read(CONFIG_FILE, encoding="utf-8")
 
         # Create PARAMETER_SECTION if it does not exist
@@ -170,34 +326,196 @@ class RPGConfig(ConfigParser):
 
         # Read the encryption key if it exists, or create a new one
         if KEY_FILE.exists():
-            with open(KEY_FILE, "r", encoding="utf-8") as keyfile:
-                key = keyfile.read()
-                self.__cipher = Fernet(key.encode())
+            cache_key = (str(KEY_FILE.resolve()), KEY_FILE.stat().st_mtime_ns)
+            if (cipher := _cipher_cache.get(cache_key)) is None:
+                with open(KEY_FILE, "r", encoding="utf-8") as keyfile:
+                    key = keyfile.read()
+                cipher = _cipher_cache[cache_key] = make_cipher(key)
+            self.__cipher = cipher
         else:
             # Generate a new key and save it to the file
-            self.__cipher = Fernet(key := Fernet.generate_key())
-            key = key.decode()
+            key = Fernet.generate_key().decode()
+            self.__cipher = make_cipher(key)
             with open(KEY_FILE, "w", encoding="utf-8") as keyfile:
                 keyfile.write(key)
-            self.log.info(f"Generated new encryption key in {KEY_FILE.name}")
+            self.log.info("Generated new encryption key in %s", KEY_FILE.name)
 
         # Count jobs and servers
-        job_count = len([s for s in self.sections() if s.startswith(JOB_PREFIX)])
-        server_count = len([s for s in self.sections() if s.startswith(SERVER_PREFIX)])
+        job_count = len(self.__section_ids(JOB_PREFIX))
+        server_count = len(self.__section_ids(SERVER_PREFIX))
         self.log.debug(
-            f"Configuration contains {job_count} jobs and {server_count} servers"
+            "Configuration contains %d jobs and %d servers", job_count, server_count
         )
 
     def __str__(self) -> str:
         return f"RPGConfig({CONFIG_FILE.name})"
 
+    def read(self, filenames, encoding=None) -> list[str]:
+        """Read and parse a configuration file
+
+        A single file as written by save() is parsed line by line straight
+        into the section dictionaries. Anything the fast path does not handle
+        (several files, indented or continuation lines, duplicates, a DEFAULT
+        section) is left to ConfigParser.read. The parsed sections are kept
+        in memory and as JSON next to the file, keyed by a digest of the file
+        contents, so reading it again while it is unchanged skips the parse,
+        also in a later process.
+
+        Args:
+            filenames (str | os.PathLike | Iterable): The file(s) to read
+            encoding (str): The file encoding
+
+        Returns:
+            list[str]: The names of the files successfully read
+        """
+        self._section_index = None
+        if not isinstance(filenames, (str, os.PathLike)):
+            return super().read(filenames, encoding=encoding)
+        try:
+            path = os.path.realpath(filenames)
+            with open(path, "rb") as configfile:
+                data = configfile.read()
+        except OSError:
+            return []
+
+        # The contents decide whether a cache is current, mtimes can be too coarse
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if (cached := _config_cache.get(path)) and cached[0] == digest:
+            sections = cached[1]
+        else:
+            sections = load_config_cache(path, digest)
+            if sections is None or self.default_section in sections:
+                # Decode the way open() in text mode would
+                text = io.TextIOWrapper(io.BytesIO(data), encoding=encoding).read()
+                if (sections := self.__parse(text)) is None:
+                    return super().read(filenames, encoding=encoding)
+                save_config_cache(path, digest, sections)
+            _config_cache[path] = (digest, sections)
+
+        for name, options in sections.items():
+            if name not in self._sections:
+                self._sections[name] = self._dict()
+                self._proxies[name] = SectionProxy(self, name)
+            self._sections[name].update(options)
+        return [os.fspath(filenames)]
+
+    def add_section(self, section: str) -> None:
+        """Add a section and invalidate the job and server index
+
+        Args:
+            section (str): The section name
+        """
+        super().add_section(section)
+        self._section_index = None
+
+    def remove_section(self, section: str) -> bool:
+        """Remove a section and invalidate the job and server index
+
+        Args:
+            section (str): The section name
+
+        Returns:
+            bool: True if the section existed
+        """
+        existed = super().remove_section(section)
+        self._section_index = None
+        return existed
+
+    def _read(self, fp, fpname) -> None:
+        """Parse a file and invalidate the job and server index
+
+        ConfigParser.read, read_file and read_string all parse through here.
+        read_dict adds its sections with add_section().
+
+        Args:
+            fp (Iterable[str]): The lines to parse
+            fpname (str): The name of the file, for error messages
+        """
+        super()._read(fp, fpname)
+        self._section_index = None
+
     # ----- Private Methods ---------------------------------------------------
 
+    def __job_details(
+        self, job_id: str, job: SectionProxy, now: datetime
+    ) -> tuple[bool, str, datetime, datetime]:
+        """Work out the get_job tuple of a job section as of now"""
+        cron = job["cron"]
+        last_run_text = job.get("last_run", "")
+
+        # A cached result holds until the job changes or its next run is reached
+        cached = self._job_cache.get(job_id)
+        if cached and cached[:2] == (cron, last_run_text) and now < cached[2][3]:
+            return cached[2]
+
+        cron_day, cron_dow = cron_days(cron)
+
+        cron_iter = croniter(cron, now, hash_id=job_id)
+        next_run = cron_iter.get_next(datetime)
+        prev_run = cron_iter.get_prev(datetime)
+        if last_run_text:
+            last_run = datetime.fromisoformat(last_run_text)
+            is_due = last_run < prev_run
+        else:
+            last_run = datetime.min
+            is_due = True
+        result = (is_due, cron_day if cron_day != "*" else cron_dow, last_run, next_run)
+        self._job_cache[job_id] = (cron, last_run_text, result)
+        return result
+
+    def __section_ids(self, prefix: str) -> list[str]:
+        """Return the sorted IDs of all sections with a prefix
+
+        Job and server IDs are collected in a single pass over the sections
+        and kept until a section is added or removed.
+        """
+        if self._section_index is None:
+            index: dict[str, list[str]] = {JOB_PREFIX: [], SERVER_PREFIX: []}
+            for section in self.sections():
+                for section_prefix, ids in index.items():
+                    if section.startswith(section_prefix):
+                        ids.append(section[len(section_prefix) :])
+                        break
+            for ids in index.values():
+                ids.sort()
+            self._section_index = index
+        return self._section_index[prefix]
+
+    def __parse(self, text: str) -> dict[str, dict[str, str]] | None:
+        """Parse simple INI text into {section: {option: value}}
+
+        Uses the same section and option patterns as ConfigParser. Returns
+        None as soon as a line needs more than that, so the caller can fall
+        back to the full parser.
+        """
+        sections: dict[str, dict[str, str]] = {}
+        options = None
+        for line in text.splitlines():
+            value = line.strip()
+            if not value or value.startswith(self._comment_prefixes):
+                continue
+            if line[0].isspace():  # continuation line of a multi-line value
+                return None
+            if value[0] == "[" and (mo := self.SECTCRE.match(value)):
+                name = mo.group("header")
+                if name == self.default_section or name in sections:
+                    return None
+                options = sections[name] = {}
+                continue
+            if options is None or not (mo := self._optcre.match(value)):
+                return None
+            name, _, option_value = mo.group("option", "vi", "value")
+            name = self.optionxform(name.rstrip())
+            if not name or option_value is None or name in options:
+                return None
+            options[name] = option_value.strip()
+        return sections
+
     def __decrypt(self, value: str) -> str:
         """Decrypt a value if it is encrypted"""
         try:
             decrypted_value = self.__cipher.decrypt(value.encode()).decode()
-        except InvalidToken as e:
+        except INVALID_TOKEN_ERRORS as e:
             raise KeyError("Token cannot be decrypted with this key") from e
         return decrypted_value
 
@@ -205,6 +523,13 @@ class RPGConfig(ConfigParser):
         """Encrypt a value"""
         return self.__cipher.encrypt(value.encode()).decode()
 
+    def __password(self, server: SectionProxy) -> str:
+        """Return the password of a server section, decrypted if it is encrypted"""
+        password = server.get("password", "")
+        if password.startswith(FERNET_PREFIX):
+            password = self.__decrypt(password)
+        return password
+
     # ----- Parameter Functions ------------------------------------------------
 
     def get_param(self, param: str, decrypt: bool = True) -> str:
@@ -268,9 +593,11 @@ class RPGConfig(ConfigParser):
             KeyError: If the job ID does not exist
         """
         job_id = job_id.upper()
-        if not self.has_section(JOB_PREFIX + job_id):
+        section = JOB_PREFIX + job_id
+        if not self.has_section(section):
             raise KeyError(f"Job ID '{job_id}' does not exist")
-        self.remove_section(JOB_PREFIX + job_id)
+        self.remove_section(section)
+        self._job_cache.pop(job_id, None)
         self.save()
 
     def get_job(self, job_id: str) -> tuple[bool, str, datetime, datetime]:
@@ -287,25 +614,30 @@ class RPGConfig(ConfigParser):
             KeyError: If the job ID does not exist
         """
         job_id = job_id.upper()
-        if not self.has_section(JOB_PREFIX + job_id):
+        section = JOB_PREFIX + job_id
+        if not self.has_section(section):
             raise KeyError(f"Job ID '{job_id}' does not exist")
-        job = self[JOB_PREFIX + job_id]
-        cron = job["cron"]
-        # Split the cron expression into its components
-        # (minute, hour, day, month, day of week)
-        _, _, cron_day, _, cron_dow = cron.split()
+        return self.__job_details(job_id, self[section], datetime.now())
 
+    def get_jobs_bulk(
+        self, match: Callable[[str], bool] | None = None
+    ) -> dict[str, tuple[bool, str, datetime, datetime]]:
+        """Get the job details for all jobs in one pass
+
+        Args:
+            match (Callable[[str], bool]): Only include job IDs for which this
+                returns True, e.g. a key_filter(). Default is all jobs.
+
+        Returns:
+            dict[str, tuple]: The get_job tuple (is_due, day, last_run, next_run)
+                by job ID, in the same order as jobs()
+        """
         now = datetime.now()
-        cron_iter = croniter(cron, now, hash_id=job_id)
-        next_run = cron_iter.get_next(datetime)
-        prev_run = cron_iter.get_prev(datetime)
-        if last_run := job.get("last_run", None):
-            last_run = datetime.strptime(last_run, "%Y-%m-%d %H:%M:%S")
-            is_due = last_run < prev_run
-        else:
-            last_run = datetime.min
-            is_due = True
-        return is_due, cron_day if cron_day != "*" else cron_dow, last_run, next_run
+        return {
+            job_id: self.__job_details(job_id, self[JOB_PREFIX + job_id], now)
+            for job_id in self.__section_ids(JOB_PREFIX)
+            if match is None or match(job_id)
+        }
 
     def get_job_day_text(self, job_id: str) -> str:
         """Get the day text for a given job ID
@@ -317,16 +649,11 @@ class RPGConfig(ConfigParser):
             str: The day text
         """
         job_id = job_id.upper()
-        if not self.has_section(JOB_PREFIX + job_id):
+        section = JOB_PREFIX + job_id
+        if not self.has_section(section):
             raise KeyError(f"Job ID '{job_id}' does not exist")
-        job = self[JOB_PREFIX + job_id]
-        cron = job["cron"]
-        # Split the cron expression into its components
-        # (minute, hour, day, month, day of week)
-        _, _, cron_day, _, cron_dow = cron.split()
-        if cron_day not in {"*", "?"}:
-            return day_of_month_to_text(cron_day)
-        return weekday_to_text(cron_dow)
+        job = self[section]
+        return day_text(*cron_days(job["cron"]))
 
     def job_is_due(self, job_id: str) -> bool:
         """Determine if a job is due to run
@@ -337,10 +664,7 @@ class RPGConfig(ConfigParser):
         Returns:
             bool: True if the job is due to run
         """
-        job_id = job_id.upper()
-        if not self.has_section(JOB_PREFIX + job_id):
-            raise KeyError(f"Job ID '{job_id}' does not exist")
-        return self.get_job(job_id)[0]
+        return self.get_job(job_id)[0]  # raises KeyError for an unknown job ID
 
     def job_exists(self, job_id: str) -> bool:
         """Determine if a job exists
@@ -364,9 +688,11 @@ class RPGConfig(ConfigParser):
             KeyError: If the job ID does not exist
         """
         job_id = job_id.upper()
-        if not self.has_section(JOB_PREFIX + job_id):
+        section = JOB_PREFIX + job_id
+        if not self.has_section(section):
             raise KeyError(f"Job ID '{job_id}' does not exist")
-        self[JOB_PREFIX + job_id]["last_run"] = ""
+        self[section]["last_run"] = ""
+        self._job_cache.pop(job_id, None)
         self.save()
 
     def run_job(self, job_id: str) -> int:
@@ -382,31 +708,38 @@ class RPGConfig(ConfigParser):
             KeyError: If the job ID does not exist
         """
         job_id = job_id.upper()
-        if not self.has_section(JOB_PREFIX + job_id):
+        section = JOB_PREFIX + job_id
+        if not self.has_section(section):
             raise KeyError(f"Job ID '{job_id}' does not exist")
 
         # TODO: Execute the job here
         now = datetime.now()
-        self.set(JOB_PREFIX + job_id, "last_run", now.strftime("%Y-%m-%d %H:%M:%S"))
+        self.set(section, "last_run", now.isoformat(sep=" ", timespec="seconds"))
+        self._job_cache.pop(job_id, None)
         self.save()
         return 0
 
-    def set_job(self, job_id: str, day: str):
+    def set_job(self, job_id: str, day: str, create: bool = True):
         """Set the job details for a given job ID
 
         Args:
             id (str): The job ID
             day (str): The day of the week to run the job
+            create (bool): Add the job if it does not exist? Default is True.
 
         Raises:
+            KeyError: If the job ID does not exist and create is False
             ValueError: If the day specification is invalid
         """
         job_id = job_id.upper()
-        if not self.has_section(JOB_PREFIX + job_id):
-            self.add_section(JOB_PREFIX + job_id)
-
-        day_of_month = day if re.fullmatch(DAY_OF_MONTH_REGEX, day) else "*"
-        day_of_week = day if re.fullmatch(WEEKDAY_REGEX, day) else "*"
+        section = JOB_PREFIX + job_id
+        if not self.has_section(section):
+            if not create:
+                raise KeyError(f"Job ID '{job_id}' does not exist")
+            self.add_section(section)
+
+        day_of_month = day if DAY_OF_MONTH_PATTERN.fullmatch(day) else "*"
+        day_of_week = day if WEEKDAY_PATTERN.fullmatch(day) else "*"
         cron = " ".join(["H", "H", day_of_month, "*", day_of_week])
 
         # Test via croniter if the cron string is valid
@@ -416,7 +749,8 @@ class RPGConfig(ConfigParser):
         except ValueError as e:
             raise ValueError(f"Invalid day specification: {e}") from e
 
-        self[JOB_PREFIX + job_id]["cron"] = cron
+        self[section]["cron"] = cron
+        self._job_cache.pop(job_id, None)
         self.save()
 
     # ----- Server Functions --------------------------------------------------
@@ -431,9 +765,10 @@ class RPGConfig(ConfigParser):
             KeyError: If the server ID does not exist
         """
         job_id = job_id.upper()
-        if not self.has_section(SERVER_PREFIX + job_id):
+        section = SERVER_PREFIX + job_id
+        if not self.has_section(section):
             raise KeyError(f"Server ID '{job_id}' does not exist")
-        self.remove_section(SERVER_PREFIX + job_id)
+        self.remove_section(section)
         self.save()
 
     def get_server(self, job_id: str) -> tuple[str, int, str, str, str]:
@@ -450,17 +785,50 @@ class RPGConfig(ConfigParser):
             KeyError: If the server ID does not exist
         """
         job_id = job_id.upper()
-        if not self.has_section(SERVER_PREFIX + job_id):
+        section = SERVER_PREFIX + job_id
+        if not self.has_section(section):
             raise KeyError(f"Server ID '{job_id}' does not exist")
-        server = self[SERVER_PREFIX + job_id]
+        server = self[section]
         return (
             server["address"],
             server.getint("port"),
             server["user"],
-            self.__decrypt(server["password"]),
+            self.__password(server),
             server["type"].lower(),
         )
 
+    def get_servers_bulk(
+        self, match: Callable[[str], bool] | None = None
+    ) -> dict[str, tuple[str, int, str, str, str] | None]:
+        """Get the server details for all servers in one pass
+
+        Args:
+            match (Callable[[str], bool]): Only include server IDs for which
+                this returns True, e.g. a key_filter(). Default is all servers.
+
+        Returns:
+            dict[str, tuple | None]: The server details keyed by server ID, in
+                the same order as servers(). Each value is the same tuple that
+                get_server returns, or None if the section lacks a setting or
+                the password cannot be decrypted.
+        """
+        result = {}
+        for server_id in self.__section_ids(SERVER_PREFIX):
+            if match is not None and not match(server_id):
+                continue
+            server = self[SERVER_PREFIX + server_id]
+            try:
+                result[server_id] = (
+                    server["address"],
+                    server.getint("port"),
+                    server["user"],
+                    self.__password(server),
+                    server["type"].lower(),
+                )
+            except KeyError:
+                result[server_id] = None
+        return result
+
     def server_exists(self, job_id: str) -> bool:
         """Determine if a server exists
 
@@ -480,6 +848,7 @@ class RPGConfig(ConfigParser):
         user: str | None = None,
         password: str | None = None,
         server_type: str | None = None,
+        create: bool = True,
     ) -> None:
         """Set the server details for a given server ID
 
@@ -490,12 +859,19 @@ class RPGConfig(ConfigParser):
             user (str): The server username
             password (str): The server password
             server_type (str): The server type ("oracle", "mysql", or "api")
+            create (bool): Add the server if it does not exist? Default is True.
+
+        Raises:
+            KeyError: If the server ID does not exist and create is False
         """
         server_id = server_id.upper()
-        if not self.has_section(SERVER_PREFIX + server_id):
-            self.add_section(SERVER_PREFIX + server_id)
+        section = SERVER_PREFIX + server_id
+        if not self.has_section(section):
+            if not create:
+                raise KeyError(f"Server ID '{server_id}' does not exist")
+            self.add_section(section)
 
-        server = self[SERVER_PREFIX + server_id]
+        server = self[section]
         if address is not None:
             server["address"] = address
         if port is not None:
@@ -512,12 +888,7 @@ class RPGConfig(ConfigParser):
 
     def jobs(self) -> list[str]:
         """Return the ids of all defined jobs"""
-        result = []
-        for section in self.sections():
-            if section.startswith(JOB_PREFIX):
-                job_id = section[len(JOB_PREFIX) :]
-                result.append(job_id)
-        return sorted(result)
+        return list(self.__section_ids(JOB_PREFIX))
 
     def parameters(self) -> list[str]:
         """Return all parameters as a dictionary"""
@@ -525,23 +896,205 @@ class RPGConfig(ConfigParser):
 
     def servers(self) -> list[str]:
         """Return the ids of all defined servers"""
-        result = []
-        for section in self.sections():
-            if section.startswith(SERVER_PREFIX):
-                server_id = section[len(SERVER_PREFIX) :]
-                result.append(server_id)
-        return sorted(result)
+        return list(self.__section_ids(SERVER_PREFIX))
 
     def save(self) -> None:
-        """Write the current configuration to the file"""
-        with open(CONFIG_FILE, "w", encoding="utf-8") as configfile:
-            self.write(configfile)
-        self.log.debug(f"Saved configuration to {CONFIG_FILE.name}")
+        """Write the current configuration to the file
+
+        Inside a batch() block the write is deferred until the block ends.
+        """
+        if not self._autosave:
+            self._dirty = True
+            return
+        self.flush()
+
+    def flush(self) -> None:
+        """Write the current configuration to the file now
+
+        The file is written to a temporary file first and then moved into
+        place, so an interrupted write never leaves a truncated file.
+        """
+        # One temporary file per process, so the GUI and the CLI never share one
+        tmp_file = CONFIG_FILE.with_suffix(f"{CONFIG_FILE.suffix}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as configfile:
+                self.write(configfile)
+                # The data must be on disk before the rename makes it current
+                configfile.flush()
+                os.fsync(configfile.fileno())
+            os.replace(tmp_file, CONFIG_FILE)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
+        # The cached sections belong to the old contents
+        _config_cache.pop(os.path.realpath(CONFIG_FILE), None)
+        self._dirty = False
+        self.log.debug("Saved configuration to %s", CONFIG_FILE.name)
+
+    @contextmanager
+    def batch(self) -> Iterator["RPGConfig"]:
+        """Group several changes into a single file write
+
+        The file is written when the block ends normally. If the block raises,
+        its changes are left unsaved in memory instead of writing a partial
+        update.
+
+        Example:
+            with rpg.batch():
+                for job_id in job_ids:
+                    rpg.set_job(job_id, "MON")
+
+        Yields:
+            RPGConfig: This configuration
+        """
+        autosave = self._autosave
+        self._autosave = False
+        try:
+            yield self
+        finally:
+            self._autosave = autosave
+        if autosave and self._dirty:
+            self.flush()
 
 
 # ----- MODULE LEVEL FUNCTIONS ------------------------------------------------
 
 
+def start_log_listener() -> None:
+    """Start the thread that writes the records of all RPG loggers
+
+    The console and the log file each get one handler, shared by all loggers,
+    so records reach them in the order they were logged. Does nothing if the
+    listener is already running.
+    """
+    with _log_listener_lock:
+        if _log_listeners:
+            return
+        console_handler = StreamHandler()
+
+        file_format = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT, style="{")
+        # The log file is only opened once the first record is written
+        file_handler = BufferedFileHandler(
+            filename=LOG_FILE_PATH, mode="a", encoding="utf-8", delay=True
+        )
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(file_format)
+
+        listener = LogListener(
+            _log_queue, console_handler, file_handler, respect_handler_level=True
+        )
+        listener.start()
+        atexit.register(listener.stop)
+        _log_listeners["main"] = listener
+
+
+def make_cipher(key: str) -> "Fernet | FastFernet":
+    """Create a Fernet cipher, using rfernet when it is installed
+
+    Both implementations read and write the same tokens and share the
+    encrypt/decrypt API.
+
+    Args:
+        key (str): The url-safe base64 encoded key
+
+    Returns:
+        Fernet: The cipher
+    """
+    if FastFernet is not None:
+        return FastFernet(key)
+    return Fernet(key.encode())
+
+
+def load_config_cache(path: str, digest: str) -> dict[str, dict[str, str]] | None:
+    """Load the cached sections of a configuration file
+
+    The cache is plain JSON, {"digest": ..., "sections": {section: {option:
+    value}}}. A cache that cannot be read, has another shape or was made from
+    other file contents counts as a miss.
+
+    Args:
+        path (str): The configuration file path
+        digest (str): The digest of the file's current contents
+
+    Returns:
+        dict | None: The sections, or None if there is no valid cache for these
+            contents of the file
+    """
+    try:
+        with open(path + CONFIG_CACHE_SUFFIX, encoding="utf-8") as cachefile:
+            cached = json.load(cachefile)
+    except (OSError, ValueError, RecursionError):
+        return None
+    if not isinstance(cached, dict) or cached.get("digest") != digest:
+        return None
+    sections = cached.get("sections")
+    if not isinstance(sections, dict) or not all(
+        isinstance(options, dict)
+        and all(isinstance(value, str) for value in options.values())
+        for options in sections.values()
+    ):
+        return None
+    return sections
+
+
+def save_config_cache(
+    path: str, digest: str, sections: dict[str, dict[str, str]]
+) -> None:
+    """Save the sections of a configuration file as JSON next to it
+
+    A cache that cannot be written is skipped, the file is parsed next time.
+
+    Args:
+        path (str): The configuration file path
+        digest (str): The digest of the file contents the sections came from
+        sections (dict): The parsed sections
+    """
+    cache_file = path + CONFIG_CACHE_SUFFIX
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as cachefile:
+            json.dump({"digest": digest, "sections": sections}, cachefile)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        with suppress(OSError):
+            os.remove(tmp_file)
+
+
+@lru_cache(maxsize=256)
+def cron_days(cron: str) -> tuple[str, str]:
+    """Get the day of month and day of week parts of a cron expression
+
+    Jobs share a handful of distinct cron strings, so each one is split once.
+
+    Args:
+        cron (str): The cron expression (minute, hour, day, month, day of week)
+
+    Returns:
+        tuple[str, str]: The day of month and day of week parts
+    """
+    _, _, cron_day, _, cron_dow = cron.split()
+    return cron_day, cron_dow
+
+
+@lru_cache(maxsize=256)
+def day_text(day_of_month: str, day_of_week: str) -> str:
+    """Get the day text for the day parts of a cron expression
+
+    Keyed on the day parts only, so jobs that run on the same days at
+    different times share one result.
+
+    Args:
+        day_of_month (str): The day of month expression
+        day_of_week (str): The day of week expression
+
+    Returns:
+        str: The day text
+    """
+    if day_of_month not in {"*", "?"}:
+        return day_of_month_to_text(day_of_month)
+    return weekday_to_text(day_of_week)
+
+
 def day_of_month_to_text(day_of_month: str) -> str:
     """Convert a day expression to text
 
@@ -561,66 +1114,64 @@ def day_of_month_to_text(day_of_month: str) -> str:
         return day_of_month[:-1] + "th weekday"
     if "," in day_of_month:
         return "Every " + ", ".join(day_of_month.split(","))
-    if day_of_month.isdigit():
-        if day_of_month.endswith("1") and day_of_month != "11":
-            return day_of_month + "st"
-        if day_of_month.endswith("2") and day_of_month != "12":
-            return day_of_month + "nd"
-        if day_of_month.endswith("3") and day_of_month != "13":
-            return day_of_month + "rd"
-        return day_of_month + "th"
+    if day_of_month.isdecimal():
+        return day_of_month + ORDINAL_SUFFIXES[int(day_of_month) % 100]
     return f"¿{day_of_month}?"
 
 
-def weekday_to_text(weekday: str) -> str:
-    """Convert a weekday expression to text
+def key_filter(pattern: str) -> Callable[[str], bool]:
+    """Build a predicate that matches names against a wildcard pattern
+
+    Exact names and plain "prefix*" patterns are tested with string methods;
+    any other pattern is compiled to a regular expression once. As with
+    fnmatch(), names are compared using the case rules of the platform.
 
     Args:
-        weekday (str): The weekday expression
+        pattern (str): The wildcard pattern
 
     Returns:
-        str: The text representation
+        Callable[[str], bool]: Function returning True for matching names
     """
-    if "," in weekday:
-        return ", ".join([weekday_to_text(d) for d in weekday.split(",")])
+    normcase = os.path.normcase
+    pattern = normcase(pattern)
+    prefix = pattern.rstrip("*")
+    if GLOB_CHARS.isdisjoint(prefix):
+        if prefix == pattern:
+            return lambda name: normcase(name) == pattern
+        return lambda name: normcase(name).startswith(prefix)
+    match = re.compile(translate(pattern)).match
+    return lambda name: match(normcase(name)) is not None
+
+
+def _weekday_token(weekday: str) -> str:
+    """Convert a single weekday expression (no commas) to text"""
+    if (text := WEEKDAY_MAP.get(weekday.upper())) is not None:
+        return text
     if weekday in {"?", "*"}:
         return "weekday"
     if "#" in weekday:
         weekday_split = weekday.split("#")
         text = weekday_split[1]
-        if text == "1":
-            text += "st"
-        elif text == "2":
-            text += "nd"
-        elif text == "3":
-            text += "rd"
-        else:
-            text += "th"
-        text += " " + weekday_to_text(weekday_split[0])
-        text += " of the month"
-        return text
+        text += ORDINAL_SUFFIXES[int(text) % 100] if text.isdecimal() else "th"
+        return f"{text} {_weekday_token(weekday_split[0])} of the month"
     if weekday.endswith("L"):
-        return "Last " + weekday_to_text(weekday[:-1]) + " of the month"
-    WEEKDAY_MAP = {  # pylint: disable=invalid-name
-        "MON": "Mon",
-        "TUE": "Tue",
-        "WED": "Wed",
-        "THU": "Thu",
-        "FRI": "Fri",
-        "SAT": "Sat",
-        "SUN": "Sun",
-        "0": "Sun",
-        "1": "Mon",
-        "2": "Tue",
-        "3": "Wed",
-        "4": "Thu",
-        "5": "Fri",
-        "6": "Sat",
-    }
-    if weekday.upper() in WEEKDAY_MAP:
-        return WEEKDAY_MAP[weekday.upper()]
+        return "Last " + _weekday_token(weekday[:-1]) + " of the month"
     return f"¿{weekday}?"
 
 
+def weekday_to_text(weekday: str) -> str:
+    """Convert a weekday expression to text
+
+    Args:
+        weekday (str): The weekday expression
+
+    Returns:
+        str: The text representation
+    """
+    if "," not in weekday:
+        return _weekday_token(weekday)
+    return ", ".join(_weekday_token(token) for token in weekday.split(","))
+
+
 # MAINLINE ENTRY POINT =========================================================
 co.init(autoreset=True)
@@ -1,47 +1,142 @@
 """rpgmaint - RPG Maintenance Utility"""
 
-# pylint: disable=global-statement,protected-access,missing-function-docstring
-# pylint: disable=unused-argument,logging-not-lazy
+# pylint: disable=global-statement,missing-function-docstring
+# pylint: disable=unused-argument
 
 # IMPORTS
 
+import logging
 import sys
-from argparse import ArgumentParser, Namespace, _SubParsersAction
-from fnmatch import fnmatch
+from collections.abc import Callable
+from typing import Any
+from argparse import ArgumentParser, Namespace
 
-from rpgcore import RPGConfig, RPGLog, PARAMETER_SECTION
+from rpgcore import RPGConfig, RPGLog, PARAMETER_SECTION, key_filter
 
 # ===== CONSTANTS =============================================================
 
+# Return codes (2 is left to argparse, which uses it for usage errors)
+RC_USAGE = 1  # No command given, help shown
+RC_PARAM_MISSING = 3  # Parameter does not exist
+RC_JOB_EXISTS = 4  # Job already exists
+RC_JOB_MISSING = 5  # Job does not exist
+RC_JOB_INVALID = 6  # Invalid day specification
+RC_SERVER_EXISTS = 7  # Server already exists
+RC_SERVER_MISSING = 8  # Server does not exist
+
+# Column headers of the list commands
+HEADER_JOBS = f"JOBID | {'LAST RUN':16s} | {'NEXT RUN':16s} | FREQUENCY"
+HEADER_SERVERS = f"{'SERVER':10s} | {'ADDRESS':^35s} | TYPE   | USER"
+
+# Row layout of the param list command, as a bound method to call per row
+PARAM_ROW_FORMAT = "{:.<25}: {}".format
+
+# Options of "server change" passed on to RPGConfig.set_server when given
+SERVER_FIELDS = ("address", "port", "user", "password")
+
+# Parameters whose key contains one of these words are always encrypted
+SENSITIVE_KEY_WORDS = ("password", "passwd", "secret", "token")
+
+# Choices of the server --type option
+SERVER_TYPES = ("oracle", "mssql", "api")
+
+# Aliases of the subsystems and subcommands, as defined in init_argparse()
+SUBSYSTEM_ALIASES = {"p": "param", "j": "job", "s": "server"}
+COMMAND_ALIASES = {"a": "add", "c": "change", "d": "delete", "l": "list"}
+PARAM_COMMAND_ALIASES = {"s": "set", "d": "delete", "l": "list"}
+
+# Namespace attributes that hold the subcommand as typed, by subsystem
+SUBCOMMAND_DESTS = {"job": "job_command"}
+
 # Other constants
 VERSION = "0.3.1"
 
 
+# ===== CLASSES ===============================================================
+
+
+class LazyInstance:  # pylint: disable=too-few-public-methods
+    """Stand-in that creates the real object on first attribute access"""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._instance = None
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names not found on the stand-in itself
+        if self._instance is None:
+            self._instance = self._factory()
+        return getattr(self._instance, name)
+
+
 # ===== GLOBALS ===============================================================
 
 # args: Namespace  # Command line arguments
-rpg = RPGConfig()  # Configuration settings
-log = RPGLog("maint")  # Log file
+rpg = LazyInstance(RPGConfig)  # Configuration settings, read on first use
+log = LazyInstance(lambda: RPGLog("maint"))  # Log file, set up on first use
 
 # ===== FUNCTIONS =============================================================
 
 
+def _is_sensitive(key: str) -> bool:
+    """Determine if a parameter value must always be encrypted
+
+    Args:
+        key (str): The parameter key
+
+    Returns:
+        bool: True if the key contains one of the SENSITIVE_KEY_WORDS
+    """
+    key = key.lower()
+    return any(word in key for word in SENSITIVE_KEY_WORDS)
+
+
+def _job_missing(job_id: str) -> int:
+    """Report a job that does not exist
+
+    Args:
+        job_id (str): The normalized job ID
+
+    Returns:
+        int: The return code RC_JOB_MISSING
+    """
+    log.error("Job '%s' does not exist", job_id)
+    return RC_JOB_MISSING
+
+
+def _server_missing(server_name: str) -> int:
+    """Report a server that does not exist
+
+    Args:
+        server_name (str): The normalized server name
+
+    Returns:
+        int: The return code RC_SERVER_MISSING
+    """
+    log.error("Server '%s' does not exist", server_name)
+    return RC_SERVER_MISSING
+
+
 def do_param_delete(args: Namespace) -> int:
     if not rpg.has_param(args.key):
-        log.error(f"Key '{args.key}' does not exist")
-        return sys._getframe().f_lineno
+        log.error("Key '%s' does not exist", args.key)
+        return RC_PARAM_MISSING
     rpg.remove_option(PARAMETER_SECTION, args.key)
     rpg.save()
-    log.info(f"{args.key}: deleted")
+    log.info("%s: deleted", args.key)
     return 0
 
 
 def do_param_list(args: Namespace) -> int:
+    if not log.isEnabledFor(logging.INFO):
+        return 0  # the rows would not be shown
     key_pattern = args.key if args.key else ""
-    for key in rpg.parameters():
-        if fnmatch(key, key_pattern + "*"):
-            value = rpg.get_param(key, decrypt=False)
-            log.info(f"{key.ljust(25, '.')}: {value}")
+    rows = []
+    for key in filter(key_filter(key_pattern + "*"), rpg.parameters()):
+        value = rpg.get_param(key, decrypt=False)
+        rows.append(PARAM_ROW_FORMAT(key, value))
+    if rows:
+        log.info("\n".join(rows))
     return 0
 
 
@@ -49,9 +144,9 @@ def do_param_set(args: Namespace) -> int:
     rpg.set_param(
         args.key,
         args.value,
-        encrypt=args.encrypt or "password" in args.key.lower(),
+        encrypt=args.encrypt or _is_sensitive(args.key),
     )
-    log.info(f"{args.key} = {args.value}")
+    log.info("%s = %s", args.key, args.value)
     return 0
 
 
@@ -59,164 +154,178 @@ def do_job_add(args: Namespace) -> int:
     # The namespace contains the parameters 'id' and 'day'
     job_id = args.id.upper()
     if rpg.job_exists(job_id):
-        log.error(f"Job '{job_id}' already exists")
-        return sys._getframe().f_lineno
+        log.error("Job '%s' already exists", job_id)
+        return RC_JOB_EXISTS
     try:
         rpg.set_job(job_id, args.day)
     except ValueError as err:
-        log.error(str(err))
-        return sys._getframe().f_lineno
+        log.error("%s", err)
+        return RC_JOB_INVALID
     _, _, _, next_run = rpg.get_job(job_id)
     next_run = next_run.strftime("%Y-%m-%d %H:%M")
     log.info(
-        f"Job '{job_id}' scheduled for every {rpg.get_job_day_text(job_id)}. "
-        f"Next run: {next_run}"
+        "Job '%s' scheduled for every %s. Next run: %s",
+        job_id,
+        rpg.get_job_day_text(job_id),
+        next_run,
     )
     return 0
 
 
 def do_job_change(args: Namespace) -> int:
     job_id = args.id.upper()
-    if not rpg.job_exists(job_id):
-        log.error(f"Job '{job_id}' does not exist")
-        return sys._getframe().f_lineno
+    # set_job checks that the job exists, so it is only looked up once
     try:
-        rpg.set_job(job_id, args.day)
+        rpg.set_job(job_id, args.day, create=False)
+    except KeyError:
+        return _job_missing(job_id)
     except ValueError as err:
-        log.error(str(err))
-        return sys._getframe().f_lineno
-    log.info(f"Job '{job_id}' updated")
+        log.error("%s", err)
+        return RC_JOB_INVALID
+    log.info("Job '%s' updated", job_id)
     return 0
 
 
 def do_job_delete(args: Namespace) -> int:
     job_id = args.id.upper()
-    if not rpg.job_exists(job_id):
-        log.error(f"Job '{job_id}' does not exist")
-        return sys._getframe().f_lineno
-    rpg.delete_job(job_id)
-    log.info(f"Job '{job_id}' deleted")
+    try:
+        rpg.delete_job(job_id)
+    except KeyError:
+        return _job_missing(job_id)
+    log.info("Job '%s' deleted", job_id)
     return 0
 
 
 def do_job_list(args: Namespace) -> int:
+    if not log.isEnabledFor(logging.INFO):
+        return 0  # the rows would not be shown
     name_pattern = args.id if args.id else ""
-    log.info(
-        "JOBID"
-        + " | "
-        + "LAST RUN".ljust(16)
-        + " | "
-        + "NEXT RUN".ljust(16)
-        + " | "
-        + "FREQUENCY"
-    )
-    for job_id in rpg.jobs():
-        if fnmatch(job_id, name_pattern + "*"):
-            _, _, last_run, next_run = rpg.get_job(job_id)
-            freq = "Every " + rpg.get_job_day_text(job_id)
-            last_run = last_run.strftime("%Y-%m-%d %H:%M") if last_run else "Never"
-            next_run = next_run.strftime("%Y-%m-%d %H:%M")
-            log.info(f"{job_id} | {last_run:16s} | {next_run:16s} | {freq}")
+    rows = [HEADER_JOBS]
+    jobs = rpg.get_jobs_bulk(key_filter(name_pattern + "*"))
+    for job_id, (_, _, last_run, next_run) in jobs.items():
+        freq = "Every " + rpg.get_job_day_text(job_id)
+        last_run = last_run.strftime("%Y-%m-%d %H:%M") if last_run else "Never"
+        next_run = next_run.strftime("%Y-%m-%d %H:%M")
+        rows.append(f"{job_id} | {last_run:16s} | {next_run:16s} | {freq}")
+    log.info("\n".join(rows))
     return 0
 
 
 def do_server_add(args: Namespace) -> int:
     server_name = args.name.upper()
     if rpg.server_exists(server_name):
-        log.error(f"Server '{server_name}' already exists")
-        return sys._getframe().f_lineno
+        log.error("Server '%s' already exists", server_name)
+        return RC_SERVER_EXISTS
     # Add the server configuration
-    server_type = "oracle" if args.oracle else "mssql" if args.mssql else "api"
     rpg.set_server(
         server_id=server_name,
         address=args.address,
         port=args.port,
         user=args.user,
         password=args.password,
-        server_type=server_type,
+        server_type=args.type,
     )
-    log.info(f"Server '{server_name}' added")
+    log.info("Server '%s' added", server_name)
     return 0
 
 
 def do_server_change(args: Namespace) -> int:
     server_name = args.name.upper()
-    if not rpg.server_exists(server_name):
-        log.error(f"Server '{server_name}' does not exist")
-        return sys._getframe().f_lineno
-    # Update the server configuration
-    server_change = {}
-    if args.address:
-        server_change["address"] = args.address
-    if args.port:
-        server_change["port"] = args.port
-    if args.user:
-        server_change["user"] = args.user
-    if args.password:
-        server_change["password"] = args.password
-    if args.oracle:
-        server_change["type"] = "oracle"
-    elif args.mssql:
-        server_change["type"] = "mssql"
-    elif args.api:
-        server_change["type"] = "api"
-    rpg.set_server(server_name, **server_change)
-    log.info(f"Server '{server_name}' updated")
+    # Update the server configuration, set_server checks that it exists
+    server_change = {
+        field: value for field in SERVER_FIELDS if (value := getattr(args, field))
+    }
+    if args.type:
+        server_change["server_type"] = args.type
+    try:
+        rpg.set_server(server_name, create=False, **server_change)
+    except KeyError:
+        return _server_missing(server_name)
+    log.info("Server '%s' updated", server_name)
     return 0
 
 
 def do_server_delete(args: Namespace) -> int:
     server_name = args.name.upper()
-    if not rpg.server_exists(server_name):
-        log.error(f"Server '{server_name}' does not exist")
-        return sys._getframe().f_lineno
-    rpg.delete_server(server_name)
-    log.info(f"Server '{server_name}' deleted")
+    try:
+        rpg.delete_server(server_name)
+    except KeyError:
+        return _server_missing(server_name)
+    log.info("Server '%s' deleted", server_name)
     return 0
 
 
 def do_server_list(args: Namespace) -> int:
+    if not log.isEnabledFor(logging.INFO):
+        return 0  # the rows would not be shown
     name_pattern = args.name if args.name else ""
-    log.info("SERVER".ljust(10) + " | " + "ADDRESS".center(35) + " | TYPE   | USER")
-    for server_name in rpg.servers():
-        if fnmatch(server_name, name_pattern + "*"):
-            line = f"{server_name:10s} | "
-            try:
-                (hostname, port, username, _, server_type) = rpg.get_server(server_name)
-                line += f"{hostname:>30s}:{port:4d} | {server_type:6} | {username}"
-            except KeyError as e:
-                line += f"(decryption error)"
-            log.info(line)
+    rows = [HEADER_SERVERS]
+    servers = rpg.get_servers_bulk(key_filter(name_pattern + "*"))
+    for server_name, server in servers.items():
+        line = f"{server_name:10s} | "
+        if server is None:
+            line += "(decryption error)"
+        else:
+            (hostname, port, username, _, server_type) = server
+            line += f"{hostname:>30s}:{port:4d} | {server_type:6} | {username}"
+        rows.append(line)
+    log.info("\n".join(rows))
     return 0
 
 
-def init_argparse() -> ArgumentParser:
-    """Initialize the ArgumentParser object
+# Commands that take positional arguments only, which fast_parse() handles
+# without argparse: function, required arguments, optional argument with
+# its argparse default, and the defaults of the options
+FAST_COMMANDS: dict[tuple[str, str], tuple[Callable, tuple, tuple, dict]] = {
+    ("param", "set"): (do_param_set, ("key", "value"), (), {"encrypt": False}),
+    ("param", "delete"): (do_param_delete, ("key",), (), {}),
+    ("param", "list"): (do_param_list, (), ("key", "*"), {}),
+    ("job", "add"): (do_job_add, ("id", "day"), (), {}),
+    ("job", "change"): (do_job_change, ("id", "day"), (), {}),
+    ("job", "delete"): (do_job_delete, ("id",), (), {}),
+    ("job", "list"): (do_job_list, (), ("id", "*"), {}),
+    ("server", "delete"): (do_server_delete, ("name",), (), {}),
+    ("server", "list"): (do_server_list, (), ("name", "*"), {}),
+}
 
-    Returns:
-        ArgumentParser: The ArgumentParser object
-    """
-    # pylint: disable=too-many-locals,too-many-statements
 
-    parser = ArgumentParser(
-        prog="rpgmaint",
-        description="RPG Maintenance Utility",
-        epilog="",
-    )
-    parser.add_argument(
-        "-v", "--version", action="version", version=f"%(prog)s {VERSION}"
-    )
-    subparsers = parser.add_subparsers(
-        required=True,
-        title="Subsystems",
-        description="Select one of the following RPG susbsystems to manage",
-        help="RPG Subsystem",
-    )
+def fast_parse(argv: list[str]) -> Namespace | None:
+    """Parse the common commands without building the argparse parsers
 
-    # ----- Command: Configuration Parameter Management ------------------------
-    parser_param = subparsers.add_parser(
-        "param", aliases=["p"], help="Configuration Parameters"
-    )
+    Args:
+        argv (list[str]): The command line arguments without the program name
+
+    Returns:
+        Namespace: The parsed arguments, as argparse would return them, or None
+            if the command line needs argparse (options, help or errors)
+    """
+    if len(argv) < 2:
+        return None
+    subsystem = SUBSYSTEM_ALIASES.get(argv[0], argv[0])
+    aliases = PARAM_COMMAND_ALIASES if subsystem == "param" else COMMAND_ALIASES
+    entry = FAST_COMMANDS.get((subsystem, aliases.get(argv[1], argv[1])))
+    values = argv[2:]
+    if entry is None or any(value.startswith("-") for value in values):
+        return None
+    func, required, optional, defaults = entry
+    if not len(required) <= len(values) <= len(required) + bool(optional):
+        return None
+    args = Namespace(func=func, **defaults)
+    if (dest := SUBCOMMAND_DESTS.get(subsystem)) is not None:
+        setattr(args, dest, argv[1])
+    if optional:
+        setattr(args, optional[0], optional[1])
+    for name, value in zip(required + optional[:1], values):
+        setattr(args, name, value)
+    return args
+
+
+def add_param_subcommands(parser_param: ArgumentParser) -> None:
+    """Add the subcommands of the "param" subsystem
+
+    Args:
+        parser_param (ArgumentParser): The parser of the subsystem
+    """
     subparseres_config = parser_param.add_subparsers(
         required=True,
         title="Parameter Subcommands",
@@ -252,11 +361,16 @@ def init_argparse() -> ArgumentParser:
     )
     parser_param_list.set_defaults(func=do_param_list)
 
-    # ----- Command: Job Management --------------------------------------------
-    parser_job = subparsers.add_parser("job", aliases=["j"], help="Job Scheduling")
+
+def add_job_subcommands(parser_job: ArgumentParser) -> None:
+    """Add the subcommands of the "job" subsystem
+
+    Args:
+        parser_job (ArgumentParser): The parser of the subsystem
+    """
     subparsers_job = parser_job.add_subparsers(
         required=True,
-        dest="job_command",
+        dest=SUBCOMMAND_DESTS["job"],
         title="Job Subcmmands",
         description="Use one of the following subcommands to manage the scheduled jobs",
         help="Action",
@@ -313,10 +427,13 @@ def init_argparse() -> ArgumentParser:
     )
     parser_job_list.set_defaults(func=do_job_list)
 
-    # ----- Command: Server Connections ----------------------------------------
-    parser_server = subparsers.add_parser(
-        "server", aliases=["s"], help="Server Connnections"
-    )
+
+def add_server_subcommands(parser_server: ArgumentParser) -> None:
+    """Add the subcommands of the "server" subsystem
+
+    Args:
+        parser_server (ArgumentParser): The parser of the subsystem
+    """
     subparsers_server = parser_server.add_subparsers(
         required=True,
         title="Server Subcommands",
@@ -359,15 +476,12 @@ def init_argparse() -> ArgumentParser:
         metavar="PASSWORD",
         help="Password to be used when logging on to the server",
     )
-    server_type_mutex = parser_server_add.add_mutually_exclusive_group(required=True)
-    server_type_mutex.add_argument(
-        "-o", "--oracle", action="store_true", help="Use the Oracle connection protocol"
-    )
-    server_type_mutex.add_argument(
-        "-m", "--mssql", action="store_true", help="Use the MS-SQL connection protocol"
-    )
-    server_type_mutex.add_argument(
-        "-A", "--api", action="store_true", help="Indicates an API connection"
+    parser_server_add.add_argument(
+        "-t",
+        "--type",
+        required=True,
+        choices=SERVER_TYPES,
+        help="Connection protocol of the server",
     )
     parser_server_add.set_defaults(func=do_server_add)
     # ----- Subcommand: server change
@@ -402,15 +516,11 @@ def init_argparse() -> ArgumentParser:
         metavar="PASSWORD",
         help="Password for the server connection",
     )
-    server_type_mutex = parser_server_change.add_mutually_exclusive_group()
-    server_type_mutex.add_argument(
-        "-o", "--oracle", action="store_true", help="Use the Oracle connection protocol"
-    )
-    server_type_mutex.add_argument(
-        "-m", "--mssql", action="store_true", help="Use the MS-SQL connection protocol"
-    )
-    server_type_mutex.add_argument(
-        "-A", "--api", action="store_true", help="Indicates an API connection"
+    parser_server_change.add_argument(
+        "-t",
+        "--type",
+        choices=SERVER_TYPES,
+        help="Connection protocol of the server",
     )
     parser_server_change.set_defaults(func=do_server_change)
     # ----- Subcommand: server delete
@@ -437,7 +547,51 @@ def init_argparse() -> ArgumentParser:
     )
     parser_server_list.set_defaults(func=do_server_list)
 
-    return parser
+
+def init_argparse(
+    subsystem: str | None = None,
+) -> tuple[ArgumentParser, list[ArgumentParser]]:
+    """Initialize the ArgumentParser object
+
+    Only the subcommands of the selected subsystem are set up, the others
+    just get their entry in the top level help.
+
+    Args:
+        subsystem (str): The subsystem name or alias from the command line,
+            or None to set up all subsystems.
+
+    Returns:
+        tuple[ArgumentParser, list[ArgumentParser]]: The ArgumentParser object
+            and the parsers of the subsystems
+    """
+    parser = ArgumentParser(
+        prog="rpgmaint",
+        description="RPG Maintenance Utility",
+        epilog="",
+    )
+    parser.add_argument(
+        "-v", "--version", action="version", version=f"%(prog)s {VERSION}"
+    )
+    subparsers = parser.add_subparsers(
+        required=True,
+        title="Subsystems",
+        description="Select one of the following RPG susbsystems to manage",
+        help="RPG Subsystem",
+    )
+
+    subsystems = (
+        ("param", ["p"], "Configuration Parameters", add_param_subcommands),
+        ("job", ["j"], "Job Scheduling", add_job_subcommands),
+        ("server", ["s"], "Server Connnections", add_server_subcommands),
+    )
+    subsystem_parsers = []
+    for name, aliases, help_text, add_subcommands in subsystems:
+        parser_subsystem = subparsers.add_parser(name, aliases=aliases, help=help_text)
+        if subsystem is None or subsystem in (name, *aliases):
+            add_subcommands(parser_subsystem)
+        subsystem_parsers.append(parser_subsystem)
+
+    return parser, subsystem_parsers
 
 
 # ===== MAINLINE EXECUTION ====================================================
@@ -446,27 +600,30 @@ def init_argparse() -> ArgumentParser:
 def main():
     """Entry Point"""
 
+    # Parse the command line arguments, with argparse only when needed
+    if (args := fast_parse(sys.argv[1:])) is None:
+        subsystem = sys.argv[1] if len(sys.argv) > 1 else None
+        parser, subsystem_parsers = init_argparse(subsystem)
+        # If command line is empty, show usage and exit
+        if len(sys.argv) == 1:
+            parser.print_help()
+            # Print help messages of all subsystems
+            for parser_subsystem in subsystem_parsers:
+                print("\n" + parser_subsystem.format_help())
+            sys.exit(RC_USAGE)
+        # Usage, help and version output exit here, before the configuration is read
+        args = parser.parse_args()
+
     log_level = rpg.get_param("log_level")
     if log_level.lower() in ["debug", "info", "warning", "error", "critical"]:
         log.set_level(log_level)
     else:
-        log.error(f"Invalid log_level specified in configuration: '{log_level}'")
+        log.error("Invalid log_level specified in configuration: '%s'", log_level)
         log.error('Valid values are "DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"')
 
-    # Parse the command line arguments
-    parser = init_argparse()
-    # If command line is empty, show usage and exit
-    if len(sys.argv) == 1:
-        parser.print_help()
-        # Print help messages of all subparsers
-        for action in parser._actions:
-            if isinstance(action, _SubParsersAction):
-                for key, value in action.choices.items():
-                    if len(key) > 1:
-                        print("\n" + value.format_help())
-        sys.exit(sys._getframe().f_lineno)
-    args = parser.parse_args()  # Parse the command line arguments
-    rc = args.func(args)  # Execute the selected function
+    # Execute the selected function, writing its changes to the file once
+    with rpg.batch():
+        rc = args.func(args)
     sys.exit(rc)
 
 
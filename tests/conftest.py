@@ -0,0 +1,6 @@
+"""pytest setup: import the rpg modules the way rpgmaint.py is run"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "rpg"))
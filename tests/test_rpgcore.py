@@ -0,0 +1,123 @@
+"""Checks of RPGConfig: the INI fast path against ConfigParser, and lookups"""
+
+import io
+from configparser import ConfigParser
+from pathlib import Path
+
+import pytest
+
+from rpgcore import RPGConfig
+
+# ----- CONSTANTS -------------------------------------------------------------
+
+CONFIG_FILE = Path(__file__).resolve().parent.parent / "rpg_ods.ini"
+
+# Text the fast path parses itself
+FAST_PATH_CASES = {
+    "comments": "# comment\n; comment\n[A]\nkey = value\n",
+    "separators": "[A]\nkey=value\nother: value\nspaced   =   value  \n",
+    "empty value": "[A]\nkey =\n",
+    "hash in value": "[A]\nkey = value # not a comment\n",
+    "case": "[Section]\nKey = Value\n",
+    "blank lines": "\n[A]\n\nkey = value\n\n[B]\n",
+    "crlf": "[A]\r\nkey = value\r\n",
+}
+
+# Text the fast path leaves to ConfigParser
+FALLBACK_CASES = {
+    "default section": "[DEFAULT]\nkey = value\n[A]\nother = 1\n",
+    "continuation line": "[A]\nkey = first\n  second\n",
+    "duplicate section": "[A]\nkey = 1\n[A]\nkey = 2\n",
+    "duplicate option": "[A]\nkey = 1\nKEY = 2\n",
+    "no section header": "key = value\n",
+    "no separator": "[A]\njust a key\n",
+}
+
+# Fallback text that ConfigParser accepts
+PARSEABLE_FALLBACK_CASES = ("default section", "continuation line")
+
+# ----- FUNCTIONS -------------------------------------------------------------
+
+
+def make_config() -> RPGConfig:
+    """Return an RPGConfig that has not read or created any files"""
+    config = RPGConfig.__new__(RPGConfig)
+    ConfigParser.__init__(config)
+    return config
+
+
+def sections_of(parser: ConfigParser) -> dict[str, dict[str, str]]:
+    """Return the options of each section, as the fast path returns them"""
+    return {name: dict(parser[name]) for name in parser.sections()}
+
+
+def configparser_sections(text: str) -> dict[str, dict[str, str]]:
+    """Parse text with ConfigParser itself"""
+    parser = ConfigParser()
+    parser.read_string(text)
+    return sections_of(parser)
+
+
+def fast_parse(text: str) -> dict[str, dict[str, str]] | None:
+    """Parse text with the RPGConfig fast path"""
+    return make_config()._RPGConfig__parse(text)  # pylint: disable=protected-access
+
+
+# ----- TESTS -----------------------------------------------------------------
+
+
+def test_shipped_config_matches_configparser():
+    text = CONFIG_FILE.read_text(encoding="utf-8")
+    assert fast_parse(text) == configparser_sections(text)
+
+
+@pytest.mark.parametrize("text", FAST_PATH_CASES.values(), ids=FAST_PATH_CASES)
+def test_fast_path_matches_configparser(text):
+    assert fast_parse(text) == configparser_sections(text)
+
+
+@pytest.mark.parametrize("text", FALLBACK_CASES.values(), ids=FALLBACK_CASES)
+def test_fast_path_falls_back(text):
+    assert fast_parse(text) is None
+
+
+@pytest.mark.parametrize(
+    "text",
+    [*FAST_PATH_CASES.values(), *(FALLBACK_CASES[c] for c in PARSEABLE_FALLBACK_CASES)],
+    ids=[*FAST_PATH_CASES, *PARSEABLE_FALLBACK_CASES],
+)
+def test_read_matches_configparser(tmp_path, text):
+    path = tmp_path / "config.ini"
+    path.write_bytes(text.encode("utf-8"))
+    expected = ConfigParser()
+    expected.read(path, encoding="utf-8")
+    # The second read is served from the cache
+    for _ in range(2):
+        config = make_config()
+        assert config.read(path, encoding="utf-8") == [str(path)]
+        assert sections_of(config) == sections_of(expected)
+
+
+def test_servers_bulk_maps_incomplete_sections_to_none():
+    config = make_config()
+    config.read_string(
+        "[SERVER:FULL]\naddress = host\nport = 1\nuser = u\npassword = pw\n"
+        "type = API\n"
+        "[SERVER:PART]\naddress = host\nport = 2\n"
+    )
+    assert config.get_servers_bulk() == {
+        "FULL": ("host", 1, "u", "pw", "api"),
+        "PART": None,
+    }
+
+
+def test_section_index_follows_every_read():
+    config = make_config()
+    config.read_string("[JOB:B]\ncron = H H * * MON\n")
+    assert config.jobs() == ["B"]
+    config.read_string("[JOB:A]\ncron = H H * * TUE\n")
+    config.read_file(io.StringIO("[SERVER:Y]\naddress = host\n"))
+    assert config.jobs() == ["A", "B"]
+    assert config.servers() == ["Y"]
+    config.read_dict({"SERVER:X": {"address": "host"}})
+    assert config.servers() == ["X", "Y"]
@@ -0,0 +1,66 @@
+"""Checks of the rpgmaint fast command line path against argparse"""
+
+import pytest
+
+from rpgmaint import (
+    COMMAND_ALIASES,
+    FAST_COMMANDS,
+    PARAM_COMMAND_ALIASES,
+    SUBSYSTEM_ALIASES,
+    fast_parse,
+    init_argparse,
+)
+
+# ----- CONSTANTS -------------------------------------------------------------
+
+# Command lines that must be left to argparse
+ARGPARSE_ONLY_CASES = [
+    [],
+    ["-h"],
+    ["-v"],
+    ["param"],
+    ["param", "set", "KEY", "VALUE", "-y"],
+    ["param", "set", "KEY"],
+    ["param", "list", "-h"],
+    ["job", "add", "JOBID"],
+    ["job", "list", "A*", "B*"],
+    ["server", "add", "NAME", "-a", "host", "-p", "1", "-u", "u", "-w", "w"],
+    ["server", "list", "--", "NAME"],
+    ["unknown", "list"],
+]
+
+# ----- FUNCTIONS -------------------------------------------------------------
+
+
+def spellings(name: str, aliases: dict[str, str]) -> list[str]:
+    """Return a name and all aliases of it"""
+    return [name, *(alias for alias, full in aliases.items() if full == name)]
+
+
+def fast_command_lines() -> list[list[str]]:
+    """Return a command line for each FAST_COMMANDS entry in every spelling"""
+    command_lines = []
+    for (subsystem, command), (_, required, optional, _) in FAST_COMMANDS.items():
+        aliases = PARAM_COMMAND_ALIASES if subsystem == "param" else COMMAND_ALIASES
+        values = [f"VALUE{n}" for n in range(len(required))]
+        for subsystem_spelling in spellings(subsystem, SUBSYSTEM_ALIASES):
+            for command_spelling in spellings(command, aliases):
+                command_line = [subsystem_spelling, command_spelling, *values]
+                command_lines.append(command_line)
+                if optional:
+                    command_lines.append([*command_line, "PATTERN*"])
+    return command_lines
+
+
+# ----- TESTS -----------------------------------------------------------------
+
+
+@pytest.mark.parametrize("argv", fast_command_lines(), ids=" ".join)
+def test_fast_parse_matches_argparse(argv):
+    parser, _ = init_argparse(argv[0])
+    assert fast_parse(argv) == parser.parse_args(argv)
+
+
+@pytest.mark.parametrize("argv", ARGPARSE_ONLY_CASES, ids=" ".join)
+def test_fast_parse_leaves_the_rest_to_argparse(argv):
+    assert fast_parse(argv) is None